@@ -1,2 +1,6 @@
 from .event_manager import EventManager 
-from .project_manager import ProjectManager
\ No newline at end of file
+from .project_manager import ProjectManager
+from .video_probe import VideoProbe, VideoInfo, get_video_probe
+from .proxy_manager import ProxyManager, ProxyJob
+from .zone_model import Zone, ZoneMap
+from .timebase import Timebase, rational_fps
@@ -0,0 +1,148 @@
+"""
+Generación y gestión de proxies de reproducción
+"""
+
+import os
+import hashlib
+from typing import Dict, Optional
+import cv2
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.cache_utils import get_cache_dir, fingerprint_key, video_fingerprint
+
+
+class ProxyManager:
+    """
+    Localiza los proxies de baja resolución de cada video.
+
+    Los proxies son AVI MJPEG (todos los frames son intra) a la misma cadencia
+    y número de frames que el original, por lo que los índices de frame se
+    comparten y cualquier búsqueda en el proxy es exacta y barata. La
+    reproducción y el scrubbing usan el proxy; las exportaciones deben usar
+    siempre el original (ver resolve_source).
+    """
+
+    FOURCC = "MJPG"
+    EXTENSION = ".avi"
+
+    def __init__(self, height=360, cache_dir=None):
+        self.height = height
+        self.cache_dir = cache_dir
+        self._sources: Dict[str, str] = {}  # proxy -> original
+
+    def _get_cache_dir(self):
+        if self.cache_dir is None:
+            self.cache_dir = get_cache_dir("proxies")
+        return self.cache_dir
+
+    def proxy_path_for(self, source_path) -> str:
+        """Ruta del proxy (depende de ruta, tamaño y mtime del original)."""
+        key = hashlib.sha1(fingerprint_key(source_path).encode('utf-8')).hexdigest()[:16]
+        name = f"{os.path.splitext(os.path.basename(source_path))[0]}_{key}_{self.height}p{self.EXTENSION}"
+        return os.path.join(self._get_cache_dir(), name)
+
+    def find_proxy(self, source_path, recorded=None) -> Optional[str]:
+        """
+        Proxy existente para el original.
+
+        Args:
+            recorded: mapeo guardado en el proyecto ({'path', 'fingerprint'})
+        """
+        try:
+            fingerprint = video_fingerprint(source_path)
+        except OSError:
+            return None
+        candidates = []
+        if recorded and recorded.get('fingerprint') == fingerprint:
+            candidates.append(recorded.get('path'))
+        candidates.append(self.proxy_path_for(source_path))
+        for path in candidates:
+            if path and os.path.exists(path):
+                self._sources[path] = source_path
+                return path
+        return None
+
+    def needs_proxy(self, info) -> bool:
+        """Sólo merece la pena para fuentes claramente más grandes que el proxy."""
+        return info is not None and info.height > self.height * 2
+
+    def resolve_source(self, path) -> str:
+        """Original de un proxy (o la misma ruta si no es un proxy)."""
+        return self._sources.get(path, path)
+
+    def register(self, source_path, proxy_path):
+        self._sources[proxy_path] = source_path
+
+    def to_project_data(self, source_path, proxy_path) -> Dict:
+        """Mapeo original→proxy para guardar en el proyecto."""
+        return {
+            'path': proxy_path,
+            'height': self.height,
+            'fingerprint': video_fingerprint(source_path),
+        }
+
+
+class ProxyJob(QThread):
+    """Transcodifica el original a un proxy de baja resolución en segundo plano."""
+
+    progress = pyqtSignal(int)
+    proxy_ready = pyqtSignal(str, str)  # original, proxy
+    proxy_failed = pyqtSignal(str)
+
+    def __init__(self, source_path, proxy_path, height=360):
+        super().__init__()
+        self.source_path = source_path
+        self.proxy_path = proxy_path
+        self.height = height
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        cap = cv2.VideoCapture(self.source_path)
+        if not cap.isOpened():
+            self.proxy_failed.emit(f"No se pudo abrir {self.source_path}")
+            return
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+        src_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        src_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if src_w <= 0 or src_h <= 0:
+            cap.release()
+            self.proxy_failed.emit(f"No se pudo leer el tamaño de {self.source_path}")
+            return
+        height = min(self.height, src_h)
+        width = int(round(src_w * height / src_h / 2)) * 2
+
+        # Se escribe en un archivo temporal y se renombra al terminar
+        partial_path = self.proxy_path[:-len(ProxyManager.EXTENSION)] + ".part" + ProxyManager.EXTENSION
+        writer = cv2.VideoWriter(partial_path, cv2.VideoWriter_fourcc(*ProxyManager.FOURCC), fps, (width, height))
+        if not writer.isOpened():
+            cap.release()
+            self.proxy_failed.emit(f"No se pudo crear el proxy {self.proxy_path}")
+            return
+
+        written = 0
+        last_percent = -1
+        while not self._cancelled:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            writer.write(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+            written += 1
+            percent = min(100, written * 100 // total)
+            if percent != last_percent:
+                last_percent = percent
+                self.progress.emit(percent)
+        writer.release()
+        cap.release()
+
+        if self._cancelled or written == 0:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            if not self._cancelled:
+                self.proxy_failed.emit(f"No se pudo transcodificar {self.source_path}")
+            return
+        os.replace(partial_path, self.proxy_path)
+        self.proxy_ready.emit(self.source_path, self.proxy_path)
@@ -0,0 +1,62 @@
+"""
+Base de tiempo por índice de frame con fps racional
+"""
+import math
+from fractions import Fraction
+
+# Frecuencias NTSC (N * 1000/1001) que los contenedores reportan redondeadas
+NTSC_BASES = (24, 30, 48, 60, 120)
+
+
+def rational_fps(fps) -> Fraction:
+    """
+    Convierte unos fps en coma flotante (p.ej. 29.97002997) en su fracción exacta
+    (30000/1001). Las frecuencias que no son NTSC se aproximan con denominador pequeño.
+    """
+    if isinstance(fps, Fraction):
+        return fps
+    if not fps or fps <= 0:
+        return Fraction(30)
+    for base in NTSC_BASES:
+        if abs(fps - base * 1000 / 1001) < 1e-3:
+            return Fraction(base * 1000, 1001)
+    return Fraction(fps).limit_denominator(1001)
+
+
+class Timebase:
+    """
+    Conversión exacta entre índices de frame (0-based) y segundos.
+
+    El frame i empieza en i / fps. Los eventos, el reproductor y el timeline
+    guardan índices de frame; los segundos son sólo una vista derivada, de modo
+    que un salto a un evento cae siempre en el mismo frame, también a 29.97 o
+    59.94 fps, donde int(segundos * fps) redondea al frame anterior.
+    """
+
+    # Tolerancia (en frames) frente al error de coma flotante de los segundos
+    EPSILON = 1e-3
+
+    def __init__(self, fps=30.0):
+        self.rate = rational_fps(fps)
+
+    @property
+    def fps(self) -> float:
+        return float(self.rate)
+
+    def frame_at(self, seconds) -> int:
+        """Índice del frame que se presenta en el instante indicado."""
+        return max(0, math.floor(seconds * self.rate + self.EPSILON))
+
+    def time_at(self, frame_index) -> float:
+        """Instante (segundos) en el que empieza el frame indicado."""
+        return float(frame_index / self.rate)
+
+    def frame_count(self, seconds) -> int:
+        """Número entero de frames más próximo a una duración en segundos."""
+        return max(0, round(seconds * self.rate))
+
+    def __eq__(self, other):
+        return isinstance(other, Timebase) and self.rate == other.rate
+
+    def __repr__(self):
+        return f"Timebase({self.rate.numerator}/{self.rate.denominator})"
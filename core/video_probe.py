@@ -0,0 +1,165 @@
+"""
+Servicio de sondeo de videos con caché en memoria y en disco
+"""
+
+import os
+import json
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+import cv2
+
+from utils.cache_utils import get_cache_dir, fingerprint_key
+from .timebase import Timebase
+
+
+@dataclass
+class VideoInfo:
+    """Propiedades básicas de un archivo de video."""
+    duration: float = 0.0   # Segundos
+    fps: float = 30.0
+    frame_count: int = 0
+    width: int = 0
+    height: int = 0
+    codec: str = ""
+
+    @property
+    def duration_ms(self) -> int:
+        return int(self.duration * 1000)
+
+    @property
+    def timebase(self) -> Timebase:
+        return Timebase(self.fps)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'VideoInfo':
+        return cls(**data)
+
+
+class VideoProbe:
+    """
+    Obtiene duración, fps, número de frames, resolución y códec de un video.
+
+    Los resultados se memorizan por (ruta, tamaño, mtime) en memoria y en un
+    archivo JSON de la caché de la aplicación, de modo que un video ya visto
+    no vuelve a abrirse con OpenCV.
+    """
+
+    CACHE_FILE = "probe_cache.json"
+    MAX_ENTRIES = 1000  # Entradas que se conservan en disco (las más recientes)
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.probe_count = 0  # Número de sondeos reales realizados con OpenCV
+        self._memory: Dict[str, VideoInfo] = {}
+        self._disk_loaded = False
+        self._lock = threading.Lock()
+
+    def _get_cache_path(self):
+        if self.cache_path is None:
+            self.cache_path = os.path.join(get_cache_dir(), self.CACHE_FILE)
+        return self.cache_path
+
+    def _load_disk_cache(self):
+        if self._disk_loaded:
+            return
+        self._disk_loaded = True
+        path = self._get_cache_path()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key, info in data.items():
+                self._memory.setdefault(key, VideoInfo.from_dict(info))
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Error leyendo caché de sondeo: {e}")
+
+    def _prune(self):
+        """Descarta entradas de archivos borrados o modificados y limita el tamaño."""
+        for key in list(self._memory):
+            path = key.rsplit('|', 2)[0]
+            try:
+                current = fingerprint_key(path)
+            except OSError:
+                current = None
+            if current != key:
+                del self._memory[key]
+        excess = len(self._memory) - self.MAX_ENTRIES
+        for key in list(self._memory)[:max(0, excess)]:
+            del self._memory[key]
+
+    def _save_disk_cache(self):
+        self._prune()
+        try:
+            with open(self._get_cache_path(), 'w', encoding='utf-8') as f:
+                json.dump({key: info.to_dict() for key, info in self._memory.items()}, f, indent=1)
+        except OSError as e:
+            print(f"Error guardando caché de sondeo: {e}")
+
+    def probe(self, path) -> Optional[VideoInfo]:
+        """Información del video (None si no existe o no puede abrirse)."""
+        try:
+            key = fingerprint_key(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._load_disk_cache()
+            info = self._memory.get(key)
+            if info is not None:
+                return info
+
+        info = self._probe_file(path)
+        if info is None:
+            return None
+        with self._lock:
+            self._memory[key] = info
+            self._save_disk_cache()
+        return info
+
+    def _probe_file(self, path) -> Optional[VideoInfo]:
+        """Sondeo real con OpenCV."""
+        with self._lock:
+            self.probe_count += 1
+        cap = cv2.VideoCapture(path)
+        try:
+            if not cap.isOpened():
+                return None
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            fps = fps if fps > 0 else 30.0
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+            codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ")
+            return VideoInfo(
+                duration=frame_count / fps,
+                fps=fps,
+                frame_count=frame_count,
+                width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                codec=codec,
+            )
+        finally:
+            cap.release()
+
+    def invalidate(self, path):
+        """Descarta la información memorizada de un video."""
+        with self._lock:
+            self._load_disk_cache()
+            prefix = f"{os.path.abspath(path)}|"
+            for key in [k for k in self._memory if k.startswith(prefix)]:
+                del self._memory[key]
+            self._save_disk_cache()
+
+
+_shared_probe = None
+
+
+def get_video_probe() -> VideoProbe:
+    """Instancia compartida del servicio de sondeo."""
+    global _shared_probe
+    if _shared_probe is None:
+        _shared_probe = VideoProbe()
+    return _shared_probe
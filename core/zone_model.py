@@ -0,0 +1,140 @@
+"""
+Modelo de zonas en coordenadas normalizadas del video
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+
+
+@dataclass
+class Zone:
+    """Polígono con coordenadas normalizadas (0..1) respecto al frame del video."""
+    name: str = ""
+    points: List[Tuple[float, float]] = field(default_factory=list)
+    color: str = "#4CAF50"
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Zone':
+        data = dict(data)
+        data['points'] = [tuple(p) for p in data.get('points', [])]
+        return cls(**data)
+
+    def scaled_points(self, width, height, offset_x=0, offset_y=0) -> List[Tuple[float, float]]:
+        """Puntos en píxeles para un rectángulo de destino."""
+        return [(offset_x + x * width, offset_y + y * height) for x, y in self.points]
+
+
+class ZoneMap:
+    """
+    Conjunto de zonas compilado en una máscara rasterizada.
+
+    Cada píxel de la máscara guarda un campo de bits con las zonas que lo
+    contienen, por lo que las consultas punto-en-zona de N coordenadas se
+    resuelven con una única indexación de numpy, sin recorrer polígonos.
+    """
+
+    MAX_ZONES = 64  # Bits disponibles en la máscara (uint64)
+    MAX_MASK_SIZE = 1024  # Píxeles del lado mayor de la máscara
+
+    def __init__(self, zones: Optional[List[Zone]] = None, resolution=(1024, 1024)):
+        self.zones: List[Zone] = list(zones or [])
+        self.resolution = resolution  # (ancho, alto) de la máscara
+        self._mask = None
+
+    def __len__(self):
+        return len(self.zones)
+
+    def __iter__(self):
+        return iter(self.zones)
+
+    def add_zone(self, zone: Zone):
+        if len(self.zones) >= self.MAX_ZONES:
+            raise ValueError(f"No se admiten más de {self.MAX_ZONES} zonas")
+        self.zones.append(zone)
+        self._mask = None
+
+    def remove_zone(self, index):
+        del self.zones[index]
+        self._mask = None
+
+    def clear(self):
+        self.zones = []
+        self._mask = None
+
+    def set_resolution(self, width, height):
+        """Resolución de la máscara (la del video, limitada a MAX_MASK_SIZE en el lado mayor)."""
+        if width <= 0 or height <= 0:
+            return
+        scale = min(1.0, self.MAX_MASK_SIZE / max(width, height))
+        self.resolution = (max(1, int(width * scale)), max(1, int(height * scale)))
+        self._mask = None
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Máscara de bits (alto x ancho, uint64), compilada bajo demanda."""
+        if self._mask is None:
+            self._mask = self._compile()
+        return self._mask
+
+    def _compile(self) -> np.ndarray:
+        width, height = self.resolution
+        mask = np.zeros((height, width), dtype=np.uint64)
+        layer = np.zeros((height, width), dtype=np.uint8)
+        for bit, zone in enumerate(self.zones):
+            if len(zone.points) < 3:
+                continue
+            polygon = np.array(zone.scaled_points(width, height), dtype=np.float32)
+            layer[:] = 0
+            cv2.fillPoly(layer, [np.round(polygon).astype(np.int32)], 1)
+            mask[layer.astype(bool)] |= np.uint64(1 << bit)
+        return mask
+
+    def _lookup(self, xs, ys) -> np.ndarray:
+        """Campo de bits de cada punto normalizado (0 fuera de toda zona)."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        width, height = self.resolution
+        inside = (xs >= 0) & (xs <= 1) & (ys >= 0) & (ys <= 1)
+        cols = np.clip((xs * width).astype(np.int64), 0, width - 1)
+        rows = np.clip((ys * height).astype(np.int64), 0, height - 1)
+        bits = self.mask[rows, cols]
+        return np.where(inside, bits, np.uint64(0))
+
+    def contains(self, xs, ys) -> np.ndarray:
+        """
+        Zonas que contienen cada punto.
+
+        Args:
+            xs, ys: arrays de N coordenadas normalizadas
+
+        Returns:
+            Array booleano (N, número de zonas)
+        """
+        bits = self._lookup(xs, ys)
+        shifts = np.arange(len(self.zones), dtype=np.uint64)
+        return ((bits[..., None] >> shifts) & np.uint64(1)).astype(bool)
+
+    def zone_at(self, xs, ys) -> np.ndarray:
+        """Índice de la primera zona que contiene cada punto (-1 si ninguna)."""
+        membership = self.contains(xs, ys)
+        if membership.shape[-1] == 0:
+            return np.full(membership.shape[:-1], -1, dtype=np.int64)
+        first = membership.argmax(axis=-1)
+        return np.where(membership.any(axis=-1), first, -1)
+
+    def zone_names_at(self, xs, ys) -> List[List[str]]:
+        """Nombres de las zonas que contienen cada punto."""
+        membership = np.atleast_2d(self.contains(xs, ys))
+        return [[self.zones[i].name for i in np.flatnonzero(row)] for row in membership]
+
+    def to_list(self) -> List[Dict]:
+        return [zone.to_dict() for zone in self.zones]
+
+    @classmethod
+    def from_list(cls, data: List[Dict], resolution=(1024, 1024)) -> 'ZoneMap':
+        return cls([Zone.from_dict(item) for item in data], resolution)
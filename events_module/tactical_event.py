@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict, field,replace
 from datetime import datetime
 import uuid
@@ -14,8 +14,11 @@ class TacticalEvent:
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     #tags: List[str] = field(default_factory=list)
     event_duration: Optional[str] = None 
-    event_start: float = 0.0
+    event_start: float = 0.0  # Vista en segundos de start_frame (compatibilidad)
     event_end: float = 0.0
+    start_frame: Optional[int] = None  # Primer frame (0-based); None en eventos antiguos
+    end_frame: Optional[int] = None    # Frame final exclusivo
+    roi_keyframes: List[Dict] = field(default_factory=list)  # Zoom digital: [{"time": s, "roi": [x, y, w, h]}]
     
     
     def to_dict(self) -> Dict:
@@ -29,6 +32,19 @@ class TacticalEvent:
     
     
     
+    def frame_range(self, timebase) -> Tuple[int, int]:
+        """(primer frame, frame final exclusivo); sin frames guardados se derivan de los segundos."""
+        start = self.start_frame if self.start_frame is not None else timebase.frame_at(self.event_start)
+        end = self.end_frame if self.end_frame is not None else timebase.frame_at(self.event_end)
+        return start, max(start, end)
+    
+    def set_frame_range(self, start_frame: int, end_frame: int, timebase):
+        """Fija el rango en frames y actualiza la vista en segundos."""
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.event_start = timebase.time_at(start_frame)
+        self.event_end = timebase.time_at(end_frame)
+    
     def copy(self) -> 'TacticalEvent':
         """Crear una copia del evento."""
         return replace(self)
\ No newline at end of file
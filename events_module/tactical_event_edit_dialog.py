@@ -49,6 +49,7 @@ class TacticalEventEditDialog(QDialog):
         self.start_spin.setDecimals(3)
         self.start_spin.setSuffix(" s")
         self.start_spin.setValue(self.event.event_start)
+        self.initial_start = self.start_spin.value()
         form_layout.addRow("Tiempo de Inicio:", self.start_spin)
         
         # Campo: Tiempo de fin
@@ -57,6 +58,7 @@ class TacticalEventEditDialog(QDialog):
         self.end_spin.setDecimals(3)
         self.end_spin.setSuffix(" s")
         self.end_spin.setValue(self.event.event_end)
+        self.initial_end = self.end_spin.value()
         form_layout.addRow("Tiempo de Fin:", self.end_spin)
         
         # Campo: Duración (calculada automáticamente)
@@ -145,8 +147,12 @@ class TacticalEventEditDialog(QDialog):
         """Obtiene el evento con los valores actualizados."""
         self.event.event_name = self.name_edit.text()
         self.event.event_type = self.type_combo.text()
-        self.event.event_start = self.start_spin.value()
-        self.event.event_end = self.end_spin.value()
+        if self.start_spin.value() != self.initial_start:
+            self.event.event_start = self.start_spin.value()
+            self.event.start_frame = None  # Se vuelve a derivar de los segundos
+        if self.end_spin.value() != self.initial_end:
+            self.event.event_end = self.end_spin.value()
+            self.event.end_frame = None
         self.event.event_duration = str(self.end_spin.value() - self.start_spin.value())
         '''
         # Minuto del partido
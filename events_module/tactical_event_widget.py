@@ -19,6 +19,11 @@ class TacticalEventWidget(QWidget):
     event_selected = pyqtSignal(dict)  # Evento seleccionado
     event_added = pyqtSignal(dict)     # Nuevo evento añadido
     event_deleted = pyqtSignal(str)    # ID del evento eliminado
+    event_loop_requested = pyqtSignal(dict)  # Reproducir el rango del evento en bucle
+    playlist_requested = pyqtSignal(list)    # Reproducir seguidos los eventos indicados
+    roi_keyframe_requested = pyqtSignal(str)  # Guardar el zoom actual en el evento (ID)
+    roi_cleared = pyqtSignal(str)             # Quitar el zoom del evento (ID)
+    events_changed = pyqtSignal(list)         # Lista completa de eventos tras editar/eliminar
     
     def __init__(self):
         super().__init__()
@@ -101,6 +106,10 @@ class TacticalEventWidget(QWidget):
         self.export_btn = QPushButton("📊 Exportar")
         action_layout.addWidget(self.export_btn)
         
+        self.playlist_btn = QPushButton("⏯️ Reproducir Todos")
+        self.playlist_btn.clicked.connect(self.play_all_events)
+        action_layout.addWidget(self.playlist_btn)
+        
         self.clear_btn = QPushButton("🗑️ Limpiar Todo")
         self.clear_btn.clicked.connect(self.clear_all_events)
         action_layout.addWidget(self.clear_btn)
@@ -186,6 +195,7 @@ class TacticalEventWidget(QWidget):
             self.add_event_to_tree(event)
             
         self.update_stats()
+        self.events_changed.emit([event.to_dict() for event in self.event_manager.events])
         
     def jump_to_event(self, item):
         """Salta a la posición del evento seleccionado."""
@@ -194,6 +204,26 @@ class TacticalEventWidget(QWidget):
             self.event_selected.emit(event.to_dict())
             
         
+    def loop_event(self, item):
+        """Solicita reproducir en bucle el rango del evento."""
+        event = item.data(0, Qt.UserRole)
+        if event:
+            self.event_loop_requested.emit(event.to_dict())
+            
+    def play_events_named(self, event_name):
+        """Solicita reproducir seguidos todos los eventos con ese nombre."""
+        events = [event for event in self.event_manager.events if event.event_name == event_name]
+        self.request_playlist(events)
+        
+    def play_all_events(self):
+        """Solicita reproducir seguidos todos los eventos registrados."""
+        self.request_playlist(self.event_manager.events)
+        
+    def request_playlist(self, events):
+        events = sorted(events, key=lambda event: event.event_start)
+        if events:
+            self.playlist_requested.emit([event.to_dict() for event in events])
+            
     def apply_filter(self, filter_text):
         """Aplica filtro a la lista de eventos."""
         # Implementar filtrado
@@ -215,7 +245,8 @@ class TacticalEventWidget(QWidget):
         if reply == QMessageBox.Yes:
             self.event_manager.events.clear()
             self.events_tree.clear()
-            self.update_stats()     
+            self.update_stats()
+            self.events_changed.emit([])     
     def update_stats(self):
         """Actualiza las estadísticas mostradas."""
         total = len(self.event_manager.events)
@@ -264,6 +295,29 @@ class TacticalEventWidget(QWidget):
         jump_action.triggered.connect(lambda: self.jump_to_event(item))
         menu.addAction(jump_action)
         
+        # Reproducir en bucle
+        loop_action = QAction("🔁 Reproducir en bucle", self)
+        loop_action.triggered.connect(lambda: self.loop_event(item))
+        menu.addAction(loop_action)
+        
+        # Reproducir todos los eventos del mismo nombre
+        event = item.data(0, Qt.UserRole)
+        if event:
+            playlist_action = QAction(f"⏯️ Reproducir todos «{event.event_name}»", self)
+            playlist_action.triggered.connect(lambda: self.play_events_named(event.event_name))
+            menu.addAction(playlist_action)
+            
+            menu.addSeparator()
+            
+            # Zoom digital animado
+            roi_action = QAction("🔍 Guardar zoom actual en el evento", self)
+            roi_action.triggered.connect(lambda: self.roi_keyframe_requested.emit(event.id))
+            menu.addAction(roi_action)
+            if event.roi_keyframes:
+                clear_roi_action = QAction(f"Quitar zoom del evento ({len(event.roi_keyframes)} keyframes)", self)
+                clear_roi_action.triggered.connect(lambda: self.roi_cleared.emit(event.id))
+                menu.addAction(clear_roi_action)
+        
         menu.addSeparator()
         
         # Editar
@@ -308,7 +362,10 @@ class TacticalEventWidget(QWidget):
             event_type=evento.event_type,
             event_start=evento.event_start,
             event_end=evento.event_end,
+            start_frame=evento.start_frame,
+            end_frame=evento.end_frame,
             event_duration=evento.event_duration,
+            roi_keyframes=list(evento.roi_keyframes),
             #match_minute=evento.match_minute,
             #tags=evento.tags,
             #coordinates=evento.coordinates
@@ -4,9 +4,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
 
-import cv2
-import numpy as np
 from datetime import timedelta
+from core.video_probe import get_video_probe
 class VideoItem(QListWidgetItem):
     """Item personalizado para la lista de videos"""
     def __init__(self, filepath):
@@ -22,29 +21,16 @@ class VideoItem(QListWidgetItem):
         #self.setIcon(self.style().standardIcon(QStyle.SP_MediaPlay))
         
     def get_video_duration(self):
-        """Obtener la duración del video en milisegundos usando OpenCV"""
-        try:
-            cap = cv2.VideoCapture(self.filepath)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-            cap.release()
-            
-            if fps > 0:
-                duration_seconds = frame_count / fps
-                return int(duration_seconds * 1000)
-            return 5000  # Default 5 segundos
-        except:
-            return 5000
+        """Obtener la duración del video en milisegundos (sondeo compartido y cacheado)"""
+        info = get_video_probe().probe(self.filepath)
+        if info and info.fps > 0:
+            return info.duration_ms
+        return 5000  # Default 5 segundos
             
     def get_video_fps(self):
         """Obtener los FPS del video"""
-        try:
-            cap = cv2.VideoCapture(self.filepath)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            cap.release()
-            return fps if fps > 0 else 30.0
-        except:
-            return 30.0
+        info = get_video_probe().probe(self.filepath)
+        return info.fps if info else 30.0
         
     def format_time(self, milliseconds):
         """Formatear tiempo de milisegundos a HH:MM:SS"""
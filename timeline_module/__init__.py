@@ -1,5 +1,7 @@
 from .timeline_item import TimelineItem
 from .timeline_ruler import TimelineRuler
+from .timeline_grid import TimelineGrid
 from .timeline_playhead_line import PlayheadLine
 from .timeline_playhead_handle import PlayheadHandle
-from .timeline import Timeline
\ No newline at end of file
+from .timeline import Timeline
+from .thumbnail_cache import ThumbnailCache, ThumbnailService, get_thumbnail_service
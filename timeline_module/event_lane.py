@@ -0,0 +1,245 @@
+import bisect
+import zlib
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+class IntervalTree:
+    """
+    Árbol de intervalos estático: intervalos ordenados por inicio en un array
+    que se recorre como un árbol binario balanceado implícito, guardando en cada
+    nodo el fin máximo de su subárbol. Consulta en O(log n + k).
+    """
+
+    def __init__(self, intervals=()):
+        self.items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self.starts = [item[0] for item in self.items]
+        self.max_end = [0.0] * len(self.items)
+        self._build(0, len(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return float('-inf')
+        mid = (lo + hi) // 2
+        max_end = max(self.items[mid][1], self._build(lo, mid), self._build(mid + 1, hi))
+        self.max_end[mid] = max_end
+        return max_end
+
+    def overlap(self, start, end):
+        """Datos de los intervalos que se solapan con [start, end], ordenados por inicio."""
+        result = []
+        # Los intervalos que empiezan después de end (índice >= hi) no pueden solaparse
+        hi = bisect.bisect_right(self.starts, end)
+        stack = [(0, len(self.items))]
+        while stack:
+            lo, top = stack.pop()
+            if lo >= top or lo >= hi:
+                continue
+            mid = (lo + top) // 2
+            if self.max_end[mid] < start:
+                continue
+            if mid + 1 < hi:
+                stack.append((mid + 1, top))
+            if mid < hi and self.items[mid][1] >= start:
+                result.append(mid)
+            stack.append((lo, mid))
+        result.sort()
+        return [self.items[index][2] for index in result]
+
+    def at(self, point):
+        """Datos de los intervalos que contienen el instante indicado."""
+        return self.overlap(point, point)
+
+
+class EventLane(QGraphicsItem):
+    """
+    Carril de eventos del timeline: un único item que pinta los rangos de los
+    eventos coloreados por categoría.
+
+    Con zoom suficiente se dibuja cada evento; cuando hay demasiados eventos a
+    la vista o son más estrechos que unos píxeles se pasa a una vista de
+    densidad agregada por columnas de BIN_WIDTH píxeles, con un rectángulo por
+    columna coloreado por la categoría dominante y con altura proporcional al
+    número de eventos, de modo que el coste no depende del número de eventos.
+    """
+
+    BIN_WIDTH = 4
+    MAX_DETAILED_EVENTS = 150
+    MIN_DETAILED_WIDTH = 3  # Píxeles de ancho medio por debajo de los que se agrega
+
+    def __init__(self, width, top, height=24, pixels_per_second=10):
+        super().__init__()
+        self.width = width
+        self.top = top
+        self.height = height
+        self.pixels_per_second = pixels_per_second
+        self.events = {}  # id -> evento serializado
+        self.category_colors = {}
+        self.tree = IntervalTree()
+        self._dirty = False
+        self.on_event_clicked = None  # Callback (evento)
+        self.background = QColor(45, 45, 45)
+        self.font = QFont("Arial", 8)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.setAcceptHoverEvents(True)
+
+    # ---- Datos ----
+
+    def set_events(self, events):
+        self.events = {event['id']: event for event in events}
+        self._invalidate()
+
+    def add_event(self, event):
+        self.events[event['id']] = event
+        self._invalidate()
+
+    def remove_event(self, event_id):
+        if self.events.pop(event_id, None) is not None:
+            self._invalidate()
+
+    def clear(self):
+        self.events.clear()
+        self._invalidate()
+
+    def set_category_colors(self, colors):
+        self.category_colors = {category: QColor(color) for category, color in colors.items()}
+        self.update()
+
+    def _invalidate(self):
+        self._dirty = True
+        self.update()
+
+    def _ensure_tree(self):
+        if self._dirty:
+            self.tree = IntervalTree(
+                (event['event_start'], max(event['event_start'], event['event_end']), event)
+                for event in self.events.values())
+            self._dirty = False
+        return self.tree
+
+    def events_at(self, seconds):
+        """Eventos que contienen el instante indicado (prueba de impacto)."""
+        return self._ensure_tree().at(seconds)
+
+    def events_between(self, start, end):
+        return self._ensure_tree().overlap(start, end)
+
+    def color_for(self, event):
+        category = event.get('event_type', '')
+        color = self.category_colors.get(category)
+        if color is None:
+            # Color estable para categorías sin definición
+            color = QColor.fromHsv(zlib.crc32(category.encode('utf-8')) % 360, 160, 220)
+            self.category_colors[category] = color
+        return color
+
+    # ---- Geometría ----
+
+    def update_zoom(self, new_pixels_per_second):
+        self.pixels_per_second = new_pixels_per_second
+        self.update()
+
+    def set_width(self, width):
+        self.prepareGeometryChange()
+        self.width = width
+
+    def boundingRect(self):
+        return QRectF(0, self.top, self.width, self.height)
+
+    # ---- Pintado ----
+
+    def paint(self, painter, option, widget):
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        if exposed.isEmpty() or self.pixels_per_second <= 0:
+            return
+        painter.fillRect(exposed, self.background)
+        pps = self.pixels_per_second
+        visible = self.events_between(exposed.left() / pps, exposed.right() / pps)
+        if not visible:
+            return
+        average_width = sum(event['event_end'] - event['event_start'] for event in visible) / len(visible) * pps
+        if len(visible) > self.MAX_DETAILED_EVENTS or average_width < self.MIN_DETAILED_WIDTH:
+            self._paint_density(painter, exposed, visible)
+        else:
+            self._paint_detailed(painter, visible)
+
+    def _paint_detailed(self, painter, events):
+        pps = self.pixels_per_second
+        painter.setFont(self.font)
+        top = self.top + 2
+        height = self.height - 4
+        for event in events:
+            x = event['event_start'] * pps
+            width = max(2.0, (event['event_end'] - event['event_start']) * pps)
+            color = self.color_for(event)
+            painter.fillRect(QRectF(x, top, width, height), QColor(color.red(), color.green(), color.blue(), 170))
+            if width > 40:
+                painter.setPen(Qt.white)
+                painter.drawText(QRectF(x + 3, top, width - 6, height), Qt.AlignVCenter | Qt.AlignLeft,
+                                 event.get('event_name', ''))
+
+    def _paint_density(self, painter, exposed, events):
+        """Un rectángulo por columna: altura según nº de eventos, color de la categoría dominante."""
+        pps = self.pixels_per_second
+        left = int(exposed.left()) // self.BIN_WIDTH * self.BIN_WIDTH
+        bins = int(exposed.right() - left) // self.BIN_WIDTH + 1
+        # Arrays de diferencias por categoría: +1 en la columna inicial, -1 tras la final
+        deltas = {}
+        for event in events:
+            category = event.get('event_type', '')
+            delta = deltas.get(category)
+            if delta is None:
+                delta = deltas[category] = [0] * (bins + 1)
+            first = int((event['event_start'] * pps - left) // self.BIN_WIDTH)
+            last = int((event['event_end'] * pps - left) // self.BIN_WIDTH)
+            delta[max(0, first)] += 1
+            delta[min(bins, max(0, last + 1))] -= 1
+        totals = [0] * bins
+        dominant = [None] * bins
+        best = [0] * bins
+        for category, delta in deltas.items():
+            count = 0
+            for index in range(bins):
+                count += delta[index]
+                if count:
+                    totals[index] += count
+                    if count > best[index]:
+                        best[index] = count
+                        dominant[index] = category
+        peak = max(totals)
+        if not peak:
+            return
+        bottom = self.top + self.height - 2
+        usable = self.height - 4
+        for index, total in enumerate(totals):
+            if not total:
+                continue
+            color = self.color_for({'event_type': dominant[index]})
+            bar = max(2.0, usable * total / peak)
+            painter.fillRect(QRectF(left + index * self.BIN_WIDTH, bottom - bar, self.BIN_WIDTH - 1, bar), color)
+
+    # ---- Interacción ----
+
+    def _events_under(self, pos):
+        seconds = pos.x() / self.pixels_per_second
+        tolerance = 2 / self.pixels_per_second  # Eventos muy cortos siguen siendo clicables
+        return self.events_between(seconds - tolerance, seconds + tolerance)
+
+    def hoverMoveEvent(self, event):
+        events = self._events_under(event.pos())
+        self.setToolTip("\n".join(
+            f"{item.get('event_name', '')} ({item['event_start']:.2f}s - {item['event_end']:.2f}s)"
+            for item in events[:10]))
+        super().hoverMoveEvent(event)
+
+    def mousePressEvent(self, event):
+        events = self._events_under(event.pos())
+        if events and event.button() == Qt.LeftButton and self.on_event_clicked:
+            self.on_event_clicked(events[-1])
+            event.accept()
+            return
+        super().mousePressEvent(event)
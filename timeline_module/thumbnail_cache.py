@@ -0,0 +1,257 @@
+"""
+Miniaturas del filmstrip del timeline: caché en disco y workers de decodificación
+"""
+import os
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+import cv2
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from utils.cache_utils import get_cache_dir, fingerprint_key
+
+
+THUMBNAIL_HEIGHT = 50
+
+
+class ThumbnailCache:
+    """
+    Miniaturas indexadas por (fingerprint del video, tiempo en ms).
+
+    Se guardan como JPEG en un directorio por video dentro de la caché de la
+    aplicación y se mantiene un LRU en memoria de QImage listos para pintar.
+    El acceso es thread-safe: los workers escriben y la GUI lee.
+    """
+
+    CACHE_SUBDIR = "thumbnails"
+    MAX_MEMORY_ITEMS = 2000
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._memory = OrderedDict()
+        self._video_dirs = {}  # fingerprint -> directorio de miniaturas
+        self._lock = threading.Lock()
+
+    def _get_cache_dir(self):
+        if self.cache_dir is None:
+            self.cache_dir = get_cache_dir(self.CACHE_SUBDIR)
+        return self.cache_dir
+
+    def video_key(self, path):
+        """Clave estable del video (cambia si el archivo se modifica)."""
+        # El fingerprint (os.stat) se recalcula siempre; sólo se memoriza su hash
+        fingerprint = fingerprint_key(path)
+        key = self._video_dirs.get(fingerprint)
+        if key is None:
+            key = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:16]
+            self._video_dirs[fingerprint] = key
+        return key
+
+    def _file_path(self, video_key, time_ms):
+        return os.path.join(self._get_cache_dir(), video_key, f"{int(time_ms)}.jpg")
+
+    def get(self, path, time_ms):
+        """Miniatura en memoria o en disco (None si aún no existe)."""
+        try:
+            key = (self.video_key(path), int(time_ms))
+        except OSError:
+            return None
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                return image
+        file_path = self._file_path(*key)
+        if not os.path.exists(file_path):
+            return None
+        image = QImage(file_path)
+        if image.isNull():
+            return None
+        self._remember(key, image)
+        return image
+
+    def put(self, path, time_ms, frame):
+        """Guarda una miniatura (frame BGR ya reducido) y la devuelve como QImage."""
+        key = (self.video_key(path), int(time_ms))
+        file_path = self._file_path(*key)
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            ok, data = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            if ok:
+                data.tofile(file_path)
+        except OSError as e:
+            print(f"Error guardando miniatura: {e}")
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w, ch = rgb.shape
+        image = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888).copy()
+        self._remember(key, image)
+        return image
+
+    def _remember(self, key, image):
+        with self._lock:
+            self._memory[key] = image
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.MAX_MEMORY_ITEMS:
+                self._memory.popitem(last=False)
+
+
+class ThumbnailWorker(QThread):
+    """Decodifica miniaturas de la cola compartida con su propio VideoCapture por video."""
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+        self._captures = {}
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def _capture_for(self, path):
+        """Capturador del archivo del que se decodifica el video (se reabre si cambia, p.ej. al tener proxy)."""
+        decode_path = self.service.decode_path(path)
+        entry = self._captures.get(path)
+        if entry is not None and entry[0] != decode_path:
+            entry[1].release()
+            entry = None
+        if entry is None:
+            entry = (decode_path, cv2.VideoCapture(decode_path))
+            self._captures[path] = entry
+        return entry[1]
+
+    def run(self):
+        while self._running:
+            try:
+                _, path, time_ms = self.service.tasks.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            ok = False
+            try:
+                ok = self.service.cache.get(path, time_ms) is not None or self._decode(path, time_ms)
+            finally:
+                self.service.finish(path, time_ms, ok)
+        for _, cap in self._captures.values():
+            cap.release()
+        self._captures.clear()
+
+    def _decode(self, path, time_ms):
+        """Decodifica y guarda una miniatura; False si no hay frame en ese instante."""
+        cap = self._capture_for(path)
+        if not cap.isOpened():
+            return False
+        cap.set(cv2.CAP_PROP_POS_MSEC, time_ms)
+        ret, frame = cap.read()
+        if not ret:
+            return False
+        height = THUMBNAIL_HEIGHT
+        width = max(1, int(round(height * frame.shape[1] / frame.shape[0])))
+        thumbnail = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        image = self.service.cache.put(path, time_ms, thumbnail)
+        self.service.thumbnail_ready.emit(path, int(time_ms), image)
+        return True
+
+
+class ThumbnailService(QObject):
+    """
+    Pool de workers que genera miniaturas bajo demanda.
+
+    Las peticiones se atienden en orden inverso (la última primero) para que al
+    desplazar el timeline se decodifique antes lo que está a la vista. Las
+    peticiones repetidas de una miniatura pendiente se ignoran, y las que ya
+    fallaron (archivo ilegible, instante sin frame) no se vuelven a intentar.
+    """
+
+    thumbnail_ready = pyqtSignal(str, int, QImage)  # ruta, tiempo (ms), miniatura
+
+    def __init__(self, worker_count=None, cache=None):
+        super().__init__()
+        self.cache = cache or ThumbnailCache()
+        self.tasks = queue.LifoQueue()
+        self._pending = set()
+        self._failed = set()  # (ruta, ms) sin miniatura posible
+        self._decode_paths = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.worker_count = worker_count or max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.workers = []
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    def set_decode_path(self, path, decode_path):
+        """Decodifica las miniaturas de un video desde otro archivo (p.ej. su proxy)."""
+        with self._lock:
+            self._decode_paths[path] = decode_path
+            # Con otro archivo de origen lo que falló puede funcionar
+            self._failed = {key for key in self._failed if key[0] != path}
+
+    def decode_path(self, path):
+        with self._lock:
+            return self._decode_paths.get(path) or path
+
+    def request(self, path, time_ms):
+        """
+        Miniatura del instante indicado si ya está en caché; si no, la encola y
+        devuelve None (llegará por thumbnail_ready).
+        """
+        key = (path, int(time_ms))
+        with self._lock:
+            if key in self._pending or key in self._failed:
+                return None
+        image = self.cache.get(path, time_ms)
+        if image is not None:
+            return image
+        with self._lock:
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+            self._counter += 1
+            self.tasks.put((self._counter, path, int(time_ms)))
+        self._ensure_workers()
+        return None
+
+    def finish(self, path, time_ms, ok=True):
+        with self._lock:
+            key = (path, int(time_ms))
+            self._pending.discard(key)
+            if not ok:
+                self._failed.add(key)
+
+    def cancel_pending(self):
+        """Descarta las peticiones aún no atendidas."""
+        with self._lock:
+            while True:
+                try:
+                    _, path, time_ms = self.tasks.get_nowait()
+                except queue.Empty:
+                    break
+                self._pending.discard((path, time_ms))
+
+    def _ensure_workers(self):
+        if self.workers:
+            return
+        for _ in range(self.worker_count):
+            worker = ThumbnailWorker(self)
+            worker.start(QThread.LowPriority)
+            self.workers.append(worker)
+
+    def stop(self):
+        self.cancel_pending()
+        for worker in self.workers:
+            worker.stop()
+        for worker in self.workers:
+            worker.wait()
+        self.workers = []
+
+
+_shared_service = None
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    """Instancia compartida del servicio de miniaturas."""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = ThumbnailService()
+    return _shared_service
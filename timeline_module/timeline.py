@@ -3,8 +3,12 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from .timeline_item import TimelineItem
 from .timeline_ruler import TimelineRuler
+from .timeline_grid import TimelineGrid
+from .event_lane import EventLane
 from .timeline_playhead_line import PlayheadLine
 from .timeline_cutline import CutLine
+from .thumbnail_cache import get_thumbnail_service
+from core.timebase import Timebase
 
 class Timeline(QGraphicsView):
     """Widget del timeline mejorado con zoom y corte"""
@@ -13,6 +17,9 @@ class Timeline(QGraphicsView):
     timeline_changed = pyqtSignal()
     zoom_changed = pyqtSignal(int)
     playhead_moved = pyqtSignal(float)  # Emitir tiempo en segundos
+    selection_changed = pyqtSignal(float, float)  # Rango seleccionado en un item (segundos)
+    event_clicked = pyqtSignal(dict)  # Evento pulsado en el carril de eventos
+    EVENT_LANE_HEIGHT = 24
     def __init__(self):
         super().__init__()
         self._setup_scene()
@@ -25,6 +32,7 @@ class Timeline(QGraphicsView):
         self.cut_mode = False
         self.current_time = 0.0
         self.current_frame = 0
+        self.timebase = Timebase()  # Mismo timebase que el reproductor
         
         # Configuración de auto-scroll
         self.auto_scroll_config = {
@@ -40,9 +48,13 @@ class Timeline(QGraphicsView):
         self.scroll_animation.setDuration(200)  # 200ms de duración
         self.scroll_animation.setEasingCurve(QEasingCurve.InOutQuad)
         
+        get_thumbnail_service().thumbnail_ready.connect(self.on_thumbnail_ready)
+        
     def _setup_scene(self):
         """Configurar la escena"""
         self.scene = QGraphicsScene()
+        # Pocos items y uno de ellos enorme: el índice BSP sólo añade coste
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.setScene(self.scene)
         self.setMinimumHeight(150)
         self.setMaximumHeight(250)
@@ -53,32 +65,35 @@ class Timeline(QGraphicsView):
         self.max_pixels_per_second = 50
         self.pixels_per_second = 10
         self.timeline_duration = 1200
-        self.timeline_width = self.timeline_duration * self.max_pixels_per_second
+        self.timeline_width = self.timeline_duration * self.pixels_per_second
         self.timeline_height = 80
         
-        self.scene.setSceneRect(0, 0, self.timeline_width, self.timeline_height + 30)
+        self.scene.setSceneRect(0, 0, self.timeline_width, self.timeline_height + 30 + self.EVENT_LANE_HEIGHT)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         
-        
-        
     def _reset_timeline_properties(self, mseconds, pps):
-        seconds = mseconds / 1000
-        duration = seconds * 0.2
-        """Configurar propiedades del timeline"""
-        print("Resetting timeline properties")
-        print("seconds {mseconds} pps {pps}")
-        self.min_pixels_per_second = 2
-        self.max_pixels_per_second = 50
+        """Configurar propiedades del timeline para un video de la duración indicada"""
         self.pixels_per_second = pps
-        self.timeline_duration = duration
-        timeline_width = self.timeline_duration * self.max_pixels_per_second
-        self.timeline_width = self.timeline_duration * self.max_pixels_per_second
-        self.timeline_height = 80
+        self.timeline_duration = mseconds / 1000
+        self._update_scene_extent()
+        
+    def _update_scene_extent(self):
+        """
+        La escena mide lo que ocupa el video al zoom actual (no al zoom máximo),
+        así que la barra de scroll y los items de fondo no crecen con el zoom máximo.
+        """
+        self.timeline_width = self.timeline_duration * self.pixels_per_second
+        self.scene.setSceneRect(0, 0, self.timeline_width, self.timeline_height + 30 + self.EVENT_LANE_HEIGHT)
+        self.ruler.set_width(self.timeline_width)
+        self.grid.set_width(self.timeline_width)
+        self.event_lane.set_width(self.timeline_width)
+        
+    def visible_scene_range(self):
+        """Intervalo x de la escena que se ve en el viewport"""
+        rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        return rect.left(), rect.right()
         
-        self.scene.setSceneRect(0, 0, self.timeline_width, self.timeline_height + 30)
-        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
     def _create_timeline_elements(self):
         """Crear elementos del timeline"""
         # Regla
@@ -86,15 +101,15 @@ class Timeline(QGraphicsView):
         self.scene.addItem(self.ruler)
         self.ruler.setPos(0, 0)
         
-        # Fondo
-        self.timeline_bg = QGraphicsRectItem(0, 30, self.timeline_width, self.timeline_height)
-        self.timeline_bg.setBrush(QBrush(QColor(60, 60, 60)))
-        self.timeline_bg.setPen(QPen(Qt.NoPen))
-        self.scene.addItem(self.timeline_bg)
+        # Fondo y líneas de guía (un solo item)
+        self.grid = TimelineGrid(self.timeline_width, 30, self.timeline_height, self.pixels_per_second)
+        self.scene.addItem(self.grid)
         
-        # Líneas de guía
-        self.guide_lines = []
-        self.update_guide_lines()
+        # Carril de eventos
+        self.event_lane = EventLane(self.timeline_width, self.timeline_height + 30,
+                                    self.EVENT_LANE_HEIGHT, self.pixels_per_second)
+        self.event_lane.on_event_clicked = self.event_clicked.emit
+        self.scene.addItem(self.event_lane)
         
         # Playhead
         self.playhead = PlayheadLine(self.timeline_height + 30)
@@ -105,98 +120,35 @@ class Timeline(QGraphicsView):
         self.cut_line = CutLine(self.timeline_height + 30)
         self.scene.addItem(self.cut_line)
     def _reset_timeline_elements(self, mseconds, pps):
-        seconds = mseconds / 1000
-        duration = seconds * 0.2
-        """Crear elementos del timeline"""
-        timeline_width = self.timeline_duration * self.max_pixels_per_second
-        # Regla
-        self.ruler = TimelineRuler(timeline_width, 30, self.pixels_per_second)
-        self.scene.addItem(self.ruler)
-        self.ruler.setPos(0, 0)
-        
-        # Fondo
-        self.timeline_bg = QGraphicsRectItem(0, 30, timeline_width, self.timeline_height)
-        self.timeline_bg.setBrush(QBrush(QColor(60, 60, 60)))
-        self.timeline_bg.setPen(QPen(Qt.NoPen))
-        self.scene.addItem(self.timeline_bg)
-        
-        # Líneas de guía
-        self.guide_lines = []
-        self.reset_guide_lines(duration)
-        
-        # Playhead
-        self.playhead = PlayheadLine(self.timeline_height + 30)
-        self.scene.addItem(self.playhead)
-        self.playhead.setPos(0, 0)
-        
-        # Línea de corte
-        self.cut_line = CutLine(self.timeline_height + 30)
-        self.scene.addItem(self.cut_line)
+        """Ajustar los elementos del timeline al nuevo video (se reutilizan los existentes)"""
+        self.ruler.update_zoom(self.pixels_per_second)
+        self.update_guide_lines()
         
     def update_guide_lines(self):
         """Actualizar las líneas de guía según el zoom"""
-        # Eliminar líneas existentes
-        for line in self.guide_lines:
-            self.scene.removeItem(line)
-        self.guide_lines.clear()
-        
-        # Determinar intervalo según zoom
-        if self.pixels_per_second >= 20:
-            interval = 5
-        elif self.pixels_per_second >= 10:
-            interval = 10
-        elif self.pixels_per_second >= 5:
-            interval = 20
-        else:
-            interval = 30
-            
-        # Crear nuevas líneas
-        pen = QPen(QColor(80, 80, 80), 1, Qt.DashLine)
-        for second in range(0, int(self.timeline_duration) + 1, interval):
-            x = second * self.pixels_per_second
-            if x <= self.timeline_width:
-                line = self.scene.addLine(x, 30, x, self.timeline_height + 30, pen)
-                line.setZValue(-1)
-                self.guide_lines.append(line)
-    def reset_guide_lines(self,duration):
-        """Actualizar las líneas de guía según el zoom"""
-        # Eliminar líneas existentes
-        for line in self.guide_lines:
-            self.scene.removeItem(line)
-        self.guide_lines.clear()
-        
-        # Determinar intervalo según zoom
-        if self.pixels_per_second >= 20:
-            interval = 5
-        elif self.pixels_per_second >= 10:
-            interval = 10
-        elif self.pixels_per_second >= 5:
-            interval = 20
-        else:
-            interval = 30
-            
-        # Crear nuevas líneas
-        pen = QPen(QColor(80, 80, 80), 1, Qt.DashLine)
-        for second in range(0, int(duration) + 1, interval):
-            x = second * self.pixels_per_second
-            if x <= self.timeline_width:
-                line = self.scene.addLine(x, 30, x, self.timeline_height + 30, pen)
-                line.setZValue(-1)
-                self.guide_lines.append(line)
+        self.grid.update_zoom(self.pixels_per_second)
+        self.event_lane.update_zoom(self.pixels_per_second)
     
     def set_zoom(self, value):
         """Establecer el nivel de zoom (0-100)"""
         zoom_range = self.max_pixels_per_second - self.min_pixels_per_second
+        old_pps = self.pixels_per_second
         self.pixels_per_second = self.min_pixels_per_second + (value / 100) * zoom_range
+        scale = self.pixels_per_second / old_pps
+        # Mantener en pantalla el instante que estaba en el centro
+        left, right = self.visible_scene_range()
+        center_time = (left + right) / 2 / old_pps
         
+        self._update_scene_extent()
         self.ruler.update_zoom(self.pixels_per_second)
         self.update_guide_lines()
         
         for item in self.timeline_items:
             item.update_zoom(self.pixels_per_second)
+        self.playhead.setX(self.playhead.x() * scale)
             
+        self.centerOn(center_time * self.pixels_per_second, self.sceneRect().center().y())
         self.reorganize_timeline()
-        self.scene.update()
         
     def enable_cut_mode(self, enabled):
         """Activar/desactivar modo de corte"""
@@ -208,7 +160,7 @@ class Timeline(QGraphicsView):
             self.setCursor(Qt.ArrowCursor)
             #self.cut_line.setVisible(False)
             
-    def add_video(self, video_path, duration_ms, start_trim=0, end_trim=None):
+    def add_video(self, video_path, duration_ms, start_trim=0, end_trim=None, load_thumbnail=True):
         """Añadir un video al timeline automáticamente"""
         
         self.clear_timeline()
@@ -221,9 +173,10 @@ class Timeline(QGraphicsView):
         x_pos = self.next_available_x
         
         item = TimelineItem(video_path, x_pos, 40, duration_ms, 
-                           self.pixels_per_second, start_trim, end_trim)
+                           self.pixels_per_second, start_trim, end_trim, load_thumbnail)
         self.scene.addItem(item)
         self.timeline_items.append(item)
+        self._connect_item(item)
         self.set_active_item(item)
         
         item_width = (item.actual_duration_ms / 1000) * self.pixels_per_second
@@ -233,10 +186,27 @@ class Timeline(QGraphicsView):
 
         #self.timeline_duration = 1200
         #self.timeline_width = self.timeline_duration * self.max_pixels_per_second
+        self.reorganize_timeline()
         self.timeline_changed.emit()
-        self.scene.update()
         return item
         
+    def _connect_item(self, item):
+        """Reenvía las selecciones parciales del item (en ms) como segundos."""
+        item.partial_selection_changed.connect(
+            lambda start_ms, end_ms: self.selection_changed.emit(start_ms / 1000, end_ms / 1000))
+        
+    def set_video_thumbnail(self, frame):
+        """Asignar un thumbnail decodificado en segundo plano a los items sin thumbnail"""
+        for item in self.timeline_items:
+            if item.start_trim == 0:
+                item.set_thumbnail(frame)
+                
+    def on_thumbnail_ready(self, video_path, time_ms, image):
+        """Repinta los items del video cuya franja contiene la nueva miniatura"""
+        for item in self.timeline_items:
+            if item.video_path == video_path and item.start_trim - item.thumbnail_interval_ms() < time_ms <= item.end_trim:
+                item.update()
+                
     def split_item_at_position(self, item, split_x):
         """Dividir un item en la posición especificada"""
         if not isinstance(item, TimelineItem):
@@ -271,6 +241,10 @@ class Timeline(QGraphicsView):
             item.end_trim
         )
         
+        # Las miniaturas salen de la caché: no hay que decodificar nada
+        item1.placeholder_thumbnail = item.placeholder_thumbnail
+        item2.placeholder_thumbnail = item.placeholder_thumbnail
+        
         # Remover el item original
         self.scene.removeItem(item)
         self.timeline_items.remove(item)
@@ -280,6 +254,8 @@ class Timeline(QGraphicsView):
         self.scene.addItem(item2)
         self.timeline_items.append(item1)
         self.timeline_items.append(item2)
+        self._connect_item(item1)
+        self._connect_item(item2)
         
         self.reorganize_timeline()
         self.timeline_changed.emit()
@@ -342,6 +318,18 @@ class Timeline(QGraphicsView):
         self.current_frame = frame
         self.current_time = seconds
         
+    def set_timebase(self, timebase):
+        """Usa la base de tiempo del video cargado para convertir posiciones en frames."""
+        self.timebase = timebase
+        
+    def frame_at_x(self, x):
+        """Frame (0-based) bajo una posición x de la escena."""
+        return self.timebase.frame_at(max(0, x) / self.pixels_per_second)
+        
+    def x_at_frame(self, frame_index):
+        """Posición x de la escena en la que empieza un frame."""
+        return self.timebase.time_at(frame_index) * self.pixels_per_second
+        
     def get_playhead_time(self):
         """Obtener el tiempo actual del playhead en segundos"""
         return self.playhead.x() / self.pixels_per_second
@@ -382,16 +370,25 @@ class Timeline(QGraphicsView):
         self.next_available_x = last_item.x() + item_width + 0
         
     def add_event_clip(self, evento):
-        """Añadir un clip de evento al timeline"""
-        print(f"Adding event clip to timeline: {evento}")
-        if not self.current_active_item:
-            print("No active video item to attach event.")
-            return
-            
-        event_item = self.current_active_item.create_event_clip(evento)
-        if event_item:
-            self.scene.addItem(event_item)
-            self.timeline_changed.emit()
+        """Añadir un evento (serializado o TacticalEvent) al carril de eventos"""
+        if hasattr(evento, 'to_dict'):
+            evento = evento.to_dict()
+        self.event_lane.add_event(evento)
+        
+    def event_deleted(self, event_id):
+        """Quitar un evento del carril de eventos"""
+        self.event_lane.remove_event(event_id)
+        
+    def set_events(self, events):
+        """Sustituir todos los eventos del carril"""
+        self.event_lane.set_events([event.to_dict() if hasattr(event, 'to_dict') else event for event in events])
+        
+    def set_event_categories(self, event_types):
+        """Colores del carril por categoría a partir de las definiciones de tipos de evento"""
+        colors = {}
+        for event_type in event_types:
+            colors.setdefault(event_type['categoria'], event_type['color'])
+        self.event_lane.set_category_colors(colors)
     
         
     def auto_scroll_to_playhead(self, x_position):
@@ -475,6 +472,13 @@ class Timeline(QGraphicsView):
         max_scroll = self.horizontalScrollBar().maximum()
         target_scroll = max(0, min(target_scroll, max_scroll))
         
+        # No reiniciar una animación que ya va hacia el mismo destino
+        if self.scroll_animation.state() == QAbstractAnimation.Running:
+            if self.scroll_animation.endValue() == target_scroll:
+                return
+        elif self.horizontalScrollBar().value() == target_scroll:
+            return
+        
         # Animar el scroll
         self.scroll_animation.stop()
         self.scroll_animation.setStartValue(self.horizontalScrollBar().value())
@@ -0,0 +1,56 @@
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+class TimelineGrid(QGraphicsItem):
+    """Fondo de la pista con líneas de guía; un único item que pinta sólo la zona expuesta"""
+
+    def __init__(self, width, top=30, height=80, pixels_per_second=10):
+        super().__init__()
+        self.width = width
+        self.top = top
+        self.height = height
+        self.pixels_per_second = pixels_per_second
+        self.background = QColor(60, 60, 60)
+        self.pen = QPen(QColor(80, 80, 80), 1, Qt.DashLine)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.setZValue(-1)
+        self.update_interval()
+
+    def update_interval(self):
+        """Separación de las líneas de guía según el zoom"""
+        if self.pixels_per_second >= 20:
+            self.interval = 5
+        elif self.pixels_per_second >= 10:
+            self.interval = 10
+        elif self.pixels_per_second >= 5:
+            self.interval = 20
+        else:
+            self.interval = 30
+
+    def update_zoom(self, new_pixels_per_second):
+        """Actualizar cuando cambia el zoom (no crea ni elimina items)"""
+        self.pixels_per_second = new_pixels_per_second
+        self.update_interval()
+        self.update()
+
+    def set_width(self, width):
+        self.prepareGeometryChange()
+        self.width = width
+
+    def boundingRect(self):
+        return QRectF(0, self.top, self.width, self.height)
+
+    def paint(self, painter, option, widget):
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        if exposed.isEmpty() or self.pixels_per_second <= 0:
+            return
+        painter.fillRect(exposed, self.background)
+        painter.setPen(self.pen)
+        step = self.interval * self.pixels_per_second
+        bottom = self.top + self.height
+        first = int(exposed.left() // step)
+        last = int(min(exposed.right(), self.width) // step)
+        for index in range(first, last + 1):
+            x = index * step
+            painter.drawLine(QLineF(x, self.top, x, bottom))
@@ -4,13 +4,19 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from utils.time_utils import format_time
+from .thumbnail_cache import THUMBNAIL_HEIGHT, get_thumbnail_service
+
+
+class TimelineItemSignals(QObject):
+    """Señales del item (QGraphicsRectItem no es un QObject)"""
+    item_click = pyqtSignal(int)
+    partial_selection_changed = pyqtSignal(float, float) # inicio_ms, fin_ms
 
                 
 class TimelineItem(QGraphicsRectItem):
     """Item del timeline representando un video con thumbnail"""
-    item_click= pyqtSignal(int)
-    partial_selection_changed = pyqtSignal(float, float) # inicio_ms, fin_ms
-    def __init__(self, video_path, x, y, duration_ms, pixels_per_second=10, start_trim=0, end_trim=None):
+    THUMBNAIL_INTERVALS_MS = (1000, 2000, 5000, 10000, 15000, 30000, 60000, 120000, 300000, 600000)
+    def __init__(self, video_path, x, y, duration_ms, pixels_per_second=10, start_trim=0, end_trim=None, load_thumbnail=True):
         # Calcular el ancho basado en la duración
         self.original_duration_ms = duration_ms
         self.start_trim = start_trim # Punto de inicio en ms
@@ -23,6 +29,9 @@ class TimelineItem(QGraphicsRectItem):
         
         super().__init__(x, y, width, height)
         #super().setY(y)  # Asegurar que esté por encima de otros elementos
+        self.signals = TimelineItemSignals()
+        self.item_click = self.signals.item_click
+        self.partial_selection_changed = self.signals.partial_selection_changed
         self.video_path = video_path
         self.video_name = os.path.basename(video_path)
         self.pixels_per_second = pixels_per_second
@@ -51,7 +60,8 @@ class TimelineItem(QGraphicsRectItem):
         
         self._setup_item()
         self._create_ui_elements()
-        self.add_thumbnail()
+        self.placeholder_thumbnail = None  # Se pinta donde aún no hay miniatura
+        self.show_filmstrip = load_thumbnail
         
     def _setup_item(self):
         """Configurar las propiedades del item"""
@@ -60,6 +70,7 @@ class TimelineItem(QGraphicsRectItem):
         self.setFlag(QGraphicsItem.ItemIsMovable, False)
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)  # exposedRect en paint()
         
     def _create_ui_elements(self):
         """Crear elementos UI del item"""
@@ -88,10 +99,6 @@ class TimelineItem(QGraphicsRectItem):
         self._create_handles()
         #self._create_end_circle()
       
-    def create_event_clip(self, evento):
-        print  (f"Creating event clip : {evento}")
-        
-        
     def _create_handles(self):
         """Crear manijas de redimensionamiento"""
         height = self.rect().height()
@@ -135,6 +142,7 @@ class TimelineItem(QGraphicsRectItem):
         """Actualizar el item cuando cambia el zoom"""
         """Crear manijas de redimensionamiento"""
         width1 = self.final_end
+        scale = new_pixels_per_second / self.pixels_per_second
         self.pixels_per_second = new_pixels_per_second
         new_width = (self.actual_duration_ms / 1000) * new_pixels_per_second
         width2 = new_width - width1
@@ -142,7 +150,8 @@ class TimelineItem(QGraphicsRectItem):
         print(f"Updating zoom: new x: {self.x()}, new y: {self.y()}")
        
         # Actualizar el rectángulo
-        self.setRect(self.x(), 40, new_width, self.rect().height())
+        # El rect lleva el desplazamiento del clip dentro del timeline: se escala con el zoom
+        self.setRect(self.rect().x() * scale, 40, new_width, self.rect().height())
         
         print(f"Creating TimelineItem: x: {super().x()}, y: {super().y()}")
         print(f"Creating TimelineItem: x: {self.rect().x()}, y: {self.rect().y()}, width: {self.rect().width()}, height: {self.rect().height()}")
@@ -174,52 +183,61 @@ class TimelineItem(QGraphicsRectItem):
             self.setBrush(QBrush(self.normal_color))
     
     def add_thumbnail(self):
-        """Añadir thumbnail del video al item"""
-        try:
-            cap = cv2.VideoCapture(self.video_path)
-            
-            # Saltar al frame del start_trim si es necesario
-            if self.start_trim > 0:
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_number = int((self.start_trim / 1000) * fps)
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        """Mostrar el filmstrip del video (las miniaturas se generan en segundo plano)"""
+        self.show_filmstrip = True
+        self.update()
             
-            # Leer varios frames para obtener uno bueno
-            for _ in range(5):
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                    
-            if ret:
-                self._process_thumbnail(frame)
-                
-            cap.release()
-        except Exception as e:
-            print(f"Error generando thumbnail: {e}")
-            
-    def _process_thumbnail(self, frame):
-        """Procesar y mostrar el thumbnail"""
-        height = 50
-        aspect_ratio = frame.shape[1] / frame.shape[0]
-        width = int(height * aspect_ratio)
-        
-        max_width = min(int(self.rect().width() - 10), width)
-        if max_width < width:
-            width = max_width
-            height = int(width / aspect_ratio)
-        
-        thumbnail = cv2.resize(frame, (width, height))
-        thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2RGB)
-        
+    def set_thumbnail(self, frame):
+        """Miniatura provisional (p.ej. del pipeline de carga) mientras llega el filmstrip"""
+        if self.placeholder_thumbnail is not None:
+            return
+        width = max(1, int(round(THUMBNAIL_HEIGHT * frame.shape[1] / frame.shape[0])))
+        thumbnail = cv2.cvtColor(cv2.resize(frame, (width, THUMBNAIL_HEIGHT)), cv2.COLOR_BGR2RGB)
         h, w, ch = thumbnail.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(thumbnail.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qt_image)
-        
-        pixmap_item = QGraphicsPixmapItem(pixmap)
-        pixmap_item.setParentItem(self)
-        pixmap_item.setPos(5, 5)
-        pixmap_item.setOpacity(0.3)
+        self.placeholder_thumbnail = QImage(thumbnail.data, w, h, ch * w, QImage.Format_RGB888).copy()
+        self.update()
+        
+    def thumbnail_interval_ms(self):
+        """Separación entre miniaturas: el menor intervalo en que caben sin solaparse"""
+        tile_width = self.placeholder_thumbnail.width() if self.placeholder_thumbnail else THUMBNAIL_HEIGHT * 16 / 9
+        for interval in self.THUMBNAIL_INTERVALS_MS:
+            if interval / 1000 * self.pixels_per_second >= tile_width:
+                return interval
+        return self.THUMBNAIL_INTERVALS_MS[-1]
+        
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+        if self.show_filmstrip:
+            self._paint_filmstrip(painter, option.exposedRect)
+            
+    def _paint_filmstrip(self, painter, exposed):
+        """
+        Pinta las miniaturas visibles en una rejilla de tiempos absolutos del video,
+        de modo que los trozos de un corte y los proyectos reabiertos reutilizan
+        las mismas entradas de la caché.
+        """
+        rect = self.rect()
+        area = rect.intersected(exposed)
+        if area.isEmpty() or self.pixels_per_second <= 0:
+            return
+        service = get_thumbnail_service()
+        interval = self.thumbnail_interval_ms()
+        ms_per_pixel = 1000 / self.pixels_per_second
+        first_ms = self.start_trim + (area.left() - rect.left()) * ms_per_pixel
+        last_ms = min(self.end_trim, self.start_trim + (area.right() - rect.left()) * ms_per_pixel)
+        top = rect.top() + 5
+        painter.save()
+        painter.setClipRect(rect)
+        painter.setOpacity(0.5)
+        time_ms = int(first_ms // interval) * interval
+        # end_trim es exclusivo: una miniatura justo en el final no tiene frame
+        while time_ms <= last_ms and time_ms < self.end_trim:
+            image = service.request(self.video_path, time_ms) or self.placeholder_thumbnail
+            if image is not None:
+                x = rect.left() + (time_ms - self.start_trim) / ms_per_pixel
+                painter.drawImage(QPointF(x, top), image)
+            time_ms += interval
+        painter.restore()
         
     def update_text(self):
         """Actualizar el texto mostrado en el item"""
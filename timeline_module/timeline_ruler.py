@@ -6,11 +6,20 @@ from utils.time_utils import format_time
 class TimelineRuler(QGraphicsItem):
     """Regla del timeline con marcas de tiempo adaptativas al zoom"""
     
+    LABEL_MARGIN = 30  # Las etiquetas sobresalen de su marca: [x - 20, x + 30]
+    
     def __init__(self, width, height=40, pixels_per_second=10):
         super().__init__()
         self.width = width
         self.height = height
         self.pixels_per_second = pixels_per_second
+        self.label_cache = {}  # segundo -> texto, válido para el zoom actual
+        self.background = QColor(40, 40, 40)
+        self.major_pen = QPen(Qt.white, 2)
+        self.minor_pen = QPen(Qt.gray, 1)
+        self.font = QFont("Arial", 9)
+        # Sólo se pinta la parte expuesta (option.exposedRect)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
         self.update_interval()
         
     def update_interval(self):
@@ -27,6 +36,7 @@ class TimelineRuler(QGraphicsItem):
         else:
             self.major_interval = 30 # Marcas cada 30 segundos
             self.minor_interval = 10 # Marcas menores cada 10 segundos
+        self.label_cache.clear()
             
     def update_zoom(self, new_pixels_per_second):
         """Actualizar cuando cambia el zoom"""
@@ -34,33 +44,49 @@ class TimelineRuler(QGraphicsItem):
         self.update_interval()
         self.update()
         
+    def set_width(self, width):
+        self.prepareGeometryChange()
+        self.width = width
+        
     def boundingRect(self):
         return QRectF(0, 0, self.width, self.height)
         
+    def label(self, second):
+        """Texto de la marca principal (se formatea una vez por nivel de zoom)"""
+        text = self.label_cache.get(second)
+        if text is None:
+            text = format_time(second * 1000)
+            self.label_cache[second] = text
+        return text
+        
+    def visible_seconds(self, left, right, interval):
+        """Segundos múltiplos de interval cuyas marcas caen en [left, right]"""
+        pps = self.pixels_per_second
+        last = min(right, self.width) / pps
+        first = max(0, int(left / pps) // interval * interval)
+        return range(first, int(last) + 1, interval)
+        
     def paint(self, painter, option, widget):
-        """Dibujar la regla con marcas de tiempo"""
-        self.width = int(self.width)
-        painter.fillRect(0, 0, self.width, self.height, QColor(40, 40, 40))
+        """Dibujar la regla con marcas de tiempo (sólo la ventana expuesta)"""
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        if exposed.isEmpty() or self.pixels_per_second <= 0:
+            return
+        painter.fillRect(exposed, self.background)
+        left, right = exposed.left(), exposed.right()
+        pps = self.pixels_per_second
         
-        painter.setPen(QPen(Qt.white, 1))
-        font = QFont("Arial", 9)
-        painter.setFont(font)
+        # Marcas secundarias
+        painter.setPen(self.minor_pen)
+        for second in self.visible_seconds(left, right, self.minor_interval):
+            if second % self.major_interval:
+                x = int(second * pps)
+                painter.drawLine(x, self.height - 5, x, self.height)
         
-        # Dibujar marcas principales
-        for second in range(0, int(self.width / self.pixels_per_second) + 1, self.major_interval):
-            x = int(second * self.pixels_per_second)
-            
-            painter.setPen(QPen(Qt.white, 2))
+        # Marcas principales y sus etiquetas
+        painter.setPen(self.major_pen)
+        painter.setFont(self.font)
+        for second in self.visible_seconds(left - self.LABEL_MARGIN, right + self.LABEL_MARGIN,
+                                           self.major_interval):
+            x = int(second * pps)
             painter.drawLine(x, self.height - 10, x, self.height)
-            
-            time_str = format_time(second * 1000)
-            painter.drawText(x - 20, 5, 50, 20, Qt.AlignCenter, time_str)
-            
-            # Marcas secundarias
-            if second + self.major_interval <= self.width / self.pixels_per_second:
-                painter.setPen(QPen(Qt.gray, 1))
-                for sub_second in range(self.minor_interval, self.major_interval, self.minor_interval):
-                    sub_x = int((second + sub_second) * self.pixels_per_second)
-                    if sub_x < self.width:
-                        painter.drawLine(sub_x, self.height - 5, sub_x, self.height)
-
+            painter.drawText(x - 20, 5, 50, 20, Qt.AlignCenter, self.label(second))
@@ -1 +1,3 @@
-from .time_utils import format_time, format_time_long, position_to_time, time_to_position
\ No newline at end of file
+from .time_utils import format_time, format_time_long, position_to_time, time_to_position
+from .cache_utils import get_cache_dir, video_fingerprint, fingerprint_key
+from .ui_coalescer import UpdateCoalescer, display_refresh_interval_ms
\ No newline at end of file
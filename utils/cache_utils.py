@@ -0,0 +1,28 @@
+import os
+from PyQt5.QtCore import QStandardPaths
+
+
+def get_cache_dir(subdir=""):
+    """Directorio de caché de la aplicación (se crea si no existe)"""
+    base = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache", "VideoTacticsAnalyzer")
+    path = os.path.join(base, subdir) if subdir else base
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def video_fingerprint(path):
+    """Identificador del archivo de video (ruta, tamaño y fecha de modificación)"""
+    stat = os.stat(path)
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+    }
+
+
+def fingerprint_key(path):
+    """Clave de texto estable para usar el fingerprint en cachés"""
+    fp = video_fingerprint(path)
+    return f"{fp['path']}|{fp['size']}|{fp['mtime']}"
@@ -0,0 +1,60 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtGui import QGuiApplication
+
+
+def display_refresh_interval_ms(default_hz=60.0):
+    """Intervalo entre refrescos de la pantalla principal (ms)"""
+    screen = QGuiApplication.primaryScreen()
+    rate = screen.refreshRate() if screen is not None else 0
+    return 1000.0 / (rate if rate and rate > 1 else default_hz)
+
+
+class UpdateCoalescer(QObject):
+    """
+    Agrupa actualizaciones de interfaz muy frecuentes (p.ej. una por frame
+    decodificado) y aplica sólo la última como mucho una vez por intervalo.
+
+    Por defecto el intervalo es el de refresco de la pantalla: pintar más a
+    menudo no se llega a ver. La primera actualización tras un periodo de
+    calma se aplica en la siguiente vuelta del bucle de eventos.
+    """
+
+    def __init__(self, callback, interval_ms=None, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.set_interval(interval_ms)
+        self._args = None
+        self._last_flush = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._flush)
+
+    def set_interval(self, interval_ms=None):
+        """Cambia el intervalo mínimo entre actualizaciones (None: refresco de pantalla)."""
+        self.interval_ms = interval_ms if interval_ms is not None else display_refresh_interval_ms()
+
+    def post(self, *args):
+        """Registra la actualización más reciente (las anteriores pendientes se descartan)."""
+        self._args = args
+        if not self._timer.isActive():
+            elapsed = (time.monotonic() - self._last_flush) * 1000
+            self._timer.start(int(max(0.0, self.interval_ms - elapsed)))
+
+    def flush(self):
+        """Aplica ya la actualización pendiente, si la hay."""
+        if self._args is not None:
+            self._timer.stop()
+            self._flush()
+
+    def cancel(self):
+        self._timer.stop()
+        self._args = None
+
+    def _flush(self):
+        args, self._args = self._args, None
+        if args is None:
+            return
+        self._last_flush = time.monotonic()
+        self.callback(*args)
@@ -0,0 +1,110 @@
+"""
+Ángulos secundarios sincronizados con el reloj del video maestro
+"""
+import cv2
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .frame_buffer import FrameMailbox
+from .frame_converter import FrameConverter
+
+
+class AngleThread(QThread):
+    """
+    Decodifica un ángulo secundario siguiendo la posición de un MasterClock.
+
+    Cada ángulo tiene su propio VideoCapture y un desfase en segundos respecto
+    al maestro. Los saltos del maestro (cambio de generation del reloj) se
+    atienden en el propio thread, de modo que todos los ángulos se reposicionan
+    en paralelo. En modo reducido se reproduce desde un proxy de baja
+    resolución si lo hay y sólo se presenta uno de cada REDUCED_STEP frames.
+    """
+
+    REDUCED_STEP = 2
+    MAX_CATCH_UP_SECONDS = 1.0  # Más allá de esta distancia se busca en vez de avanzar con grab()
+    IDLE_SLEEP_MS = 20
+
+    mailbox_ready = pyqtSignal()
+
+    def __init__(self, path, master_clock, offset=0.0, reduced=False, playback_path=None):
+        super().__init__()
+        self.path = path
+        self.playback_path = playback_path or path  # Proxy si existe
+        self.master_clock = master_clock
+        self.offset = offset  # Segundos que se suman a la posición del maestro
+        self.reduced = reduced
+        # Un buffer pintándose en la GUI, otro en el buzón y otro en conversión
+        self.converter = FrameConverter(pool_size=3)
+        self.mailbox = FrameMailbox()
+        self.cap = None
+        self.fps = 30.0
+        self.frame_count = 0
+        self.next_index = 0  # Frame que devolvería cap.read() sin reposicionar
+        self.shown_index = None
+        self._generation = None
+        self._running = True
+
+    def set_offset(self, offset):
+        """Cambia el desfase respecto al maestro (se aplica como un salto)."""
+        self.offset = offset
+        self._generation = None
+
+    def stop(self):
+        self._running = False
+        if self.isRunning():
+            self.wait()
+        if self.cap:
+            self.cap.release()
+        self.cap = None
+
+    def _target_index(self):
+        position = self.master_clock.position() + self.offset
+        index = int(round(position * self.fps)) - 1
+        if self.reduced and self.master_clock.rate:
+            index -= index % self.REDUCED_STEP
+        return index
+
+    def _seek(self, index):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        self.next_index = index
+
+    def _decode(self, index):
+        """Frame exacto por índice, avanzando con grab() si está cerca o buscando si no."""
+        distance = index - self.next_index
+        if distance < 0 or distance > self.MAX_CATCH_UP_SECONDS * self.fps:
+            self._seek(index)
+        while self.next_index < index:
+            if not self.cap.grab():
+                return None
+            self.next_index += 1
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.next_index = index + 1
+        return frame
+
+    def run(self):
+        self.cap = cv2.VideoCapture(self.playback_path)
+        if not self.cap.isOpened():
+            return
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.next_index = 0
+        while self._running:
+            generation = self.master_clock.generation
+            if generation != self._generation:
+                # Salto del maestro: obligar a reposicionar
+                self._generation = generation
+                self.shown_index = None
+            index = self._target_index()
+            if index < 0 or (self.frame_count and index >= self.frame_count) or index == self.shown_index:
+                self.msleep(self.IDLE_SLEEP_MS if not self.master_clock.rate else
+                            max(1, min(self.IDLE_SLEEP_MS, int(500 / self.fps))))
+                continue
+            frame = self._decode(index)
+            if frame is None:
+                self.msleep(self.IDLE_SLEEP_MS)
+                continue
+            self.shown_index = index
+            image = self.converter.convert(frame)
+            if self.mailbox.post(image):
+                self.mailbox_ready.emit()
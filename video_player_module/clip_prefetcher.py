@@ -0,0 +1,141 @@
+"""
+Precarga de los primeros frames del siguiente clip de una playlist
+"""
+import threading
+import cv2
+from PyQt5.QtCore import QThread
+
+
+class ClipPrefetcher(QThread):
+    """
+    Decodifica en segundo plano, con un VideoCapture propio, los primeros
+    frames de un rango y los deja en una FrameCache.
+
+    Mientras el reproductor muestra esos frames desde memoria, el decodificador
+    principal ya está posicionado tras ellos, de modo que el cambio de clip no
+    espera a ningún seek.
+
+    prefetch() y stop() no esperan nunca al thread: una petición nueva cancela
+    la que esté en curso y el thread la atiende en cuanto la abandona. El
+    capturador sólo se usa desde el thread.
+    """
+
+    def __init__(self, frame_cache):
+        super().__init__()
+        self.frame_cache = frame_cache
+        self.path = None
+        self.seek_index = None
+        self.all_intra = False
+        self.cap = None
+        self.next_index = None  # Frame que devolvería cap.read() sin reposicionar
+        self.start_frame = 0
+        self.frame_count = 0
+        self._request = None  # (start_frame, frame_count) pendiente de atender
+        self._reopen = False  # Cambió el video: reabrir el capturador antes de la próxima precarga
+        self._active = False  # El thread está atendiendo (o va a atender) peticiones
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def open(self, path, seek_index=None, all_intra=False):
+        """Asigna el video; el capturador se abre en la primera precarga."""
+        with self._lock:
+            self._request = None
+            self._cancelled = True
+            self._reopen = True
+            self.path = path
+            self.seek_index = seek_index
+            self.all_intra = all_intra
+
+    def close(self):
+        """Cancela la precarga, espera al thread y libera el capturador (al descargar el video)."""
+        with self._lock:
+            self._request = None
+            self._cancelled = True
+            self.path = None
+        if self.isRunning():
+            self.wait()
+        self._release()
+
+    def prefetch(self, start_frame, frame_count):
+        """Precarga frame_count frames desde start_frame (índices 0-based) sin esperar."""
+        with self._lock:
+            if self.path is None or frame_count <= 0:
+                return
+            self._request = (max(0, int(start_frame)), int(frame_count))
+            self._cancelled = True
+            start = not self._active
+            self._active = True
+        if start:
+            if self.isRunning():
+                # El thread acaba de quedarse sin trabajo y está saliendo
+                self.wait()
+            self.start()
+
+    def stop(self):
+        """Cancela la precarga en curso y la pendiente sin esperar a que el thread termine."""
+        with self._lock:
+            self._request = None
+            self._cancelled = True
+
+    def prefetched_count(self, start_frame, limit):
+        """Número de frames consecutivos disponibles en caché desde start_frame."""
+        count = 0
+        while count < limit and (start_frame + count) in self.frame_cache:
+            count += 1
+        return count
+
+    def _release(self):
+        if self.cap:
+            self.cap.release()
+        self.cap = None
+        self.next_index = None
+
+    def _position(self, frame_number):
+        if self.next_index == frame_number:
+            return
+        if self.all_intra or not (self.seek_index and self.seek_index.has_keyframes()):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        else:
+            keyframe = self.seek_index.keyframe_before(frame_number)
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            for _ in range(frame_number - keyframe):
+                if self._cancelled or not self.cap.grab():
+                    self.next_index = None
+                    return
+        self.next_index = frame_number
+
+    def run(self):
+        while True:
+            with self._lock:
+                if self._request is None:
+                    self._active = False
+                    return
+                self.start_frame, self.frame_count = self._request
+                self._request = None
+                self._cancelled = False
+                reopen, self._reopen = self._reopen, False
+                path = self.path
+            if reopen:
+                self._release()
+            if self.cap is None:
+                self.cap = cv2.VideoCapture(path)
+                self.next_index = 0
+            self._prefetch()
+
+    def _prefetch(self):
+        self._position(self.start_frame)
+        if self.next_index != self.start_frame:
+            return
+        for index in range(self.start_frame, self.start_frame + self.frame_count):
+            if self._cancelled:
+                break
+            if index in self.frame_cache:
+                # Ya precargado: avanzar sin convertir
+                if not self.cap.grab():
+                    break
+            else:
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.frame_cache.put(index, frame)
+            self.next_index = index + 1
@@ -0,0 +1,142 @@
+"""
+Buffer circular de frames decodificados por adelantado
+"""
+import threading
+from collections import deque
+
+
+class FrameRingBuffer:
+    """Cola acotada de frames (índice, frame) compartida entre decodificador y reproductor."""
+
+    def __init__(self, capacity=32):
+        self.capacity = max(1, int(capacity))
+        self.frames = deque()
+        self.generation = 0  # Se incrementa en cada flush para descartar frames obsoletos
+        self.hits = 0
+        self.misses = 0
+        self._condition = threading.Condition()
+
+    @property
+    def depth(self):
+        """Número de frames disponibles en el buffer."""
+        with self._condition:
+            return len(self.frames)
+
+    def set_capacity(self, capacity):
+        """Cambia la capacidad máxima del buffer."""
+        with self._condition:
+            self.capacity = max(1, int(capacity))
+            while len(self.frames) > self.capacity:
+                self.frames.pop()
+            self._condition.notify_all()
+
+    def put(self, frame_index, frame, generation, timeout=0.1):
+        """
+        Añade un frame al final del buffer.
+
+        Returns:
+            True si se añadió, False si el buffer seguía lleno tras el timeout
+            o si el frame pertenece a una generación anterior (hubo un flush).
+        """
+        with self._condition:
+            if generation != self.generation:
+                return False
+            if len(self.frames) >= self.capacity:
+                self._condition.wait(timeout)
+                if generation != self.generation or len(self.frames) >= self.capacity:
+                    return False
+            self.frames.append((frame_index, frame))
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=0.0):
+        """
+        Extrae el frame más antiguo del buffer.
+
+        Cuenta un acierto si había un frame listo y un fallo si hubo que esperar.
+
+        Returns:
+            Tupla (frame_index, frame) o None si no llegó ningún frame a tiempo.
+        """
+        with self._condition:
+            if self.frames:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if timeout > 0:
+                    self._condition.wait(timeout)
+                if not self.frames:
+                    return None
+            item = self.frames.popleft()
+            self._condition.notify_all()
+            return item
+
+    def peek(self, timeout=0.0):
+        """Devuelve el frame más antiguo sin extraerlo (o None)."""
+        with self._condition:
+            if not self.frames and timeout > 0:
+                self._condition.wait(timeout)
+            return self.frames[0] if self.frames else None
+
+    def flush(self):
+        """Vacía el buffer e invalida los frames que el decodificador tenga en curso."""
+        with self._condition:
+            self.frames.clear()
+            self.generation += 1
+            self._condition.notify_all()
+            return self.generation
+
+    def reset_stats(self):
+        """Reinicia los contadores de aciertos y fallos."""
+        with self._condition:
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        """Estadísticas del buffer para dimensionarlo según la máquina."""
+        with self._condition:
+            return {
+                'depth': len(self.frames),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class FrameMailbox:
+    """Buzón de una sola plaza: el decodificador sobrescribe y la GUI toma siempre el más reciente."""
+
+    def __init__(self):
+        self.dropped = 0
+        self._item = None
+        self._lock = threading.Lock()
+
+    def post(self, item):
+        """
+        Deposita un frame en el buzón.
+
+        Returns:
+            True si el buzón estaba vacío (hay que avisar a la GUI), False si se
+            sobrescribió un frame que nunca llegó a pintarse (cuenta como descartado).
+        """
+        with self._lock:
+            was_empty = self._item is None
+            if not was_empty:
+                self.dropped += 1
+            self._item = item
+            return was_empty
+
+    def take(self):
+        """Extrae el frame pendiente (o None)."""
+        with self._lock:
+            item = self._item
+            self._item = None
+            return item
+
+    def clear(self):
+        with self._lock:
+            self._item = None
+
+    def reset_stats(self):
+        with self._lock:
+            self.dropped = 0
@@ -0,0 +1,169 @@
+"""
+Caché LRU de frames decodificados y decodificador hacia atrás por GOP
+"""
+import threading
+from collections import OrderedDict
+import cv2
+
+
+class FrameCache:
+    """Caché LRU de frames indexados por número de frame, acotada por memoria."""
+
+    def __init__(self, budget_mb=256):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, frame_index):
+        with self._lock:
+            return frame_index in self._frames
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames)
+
+    def set_budget(self, budget_mb):
+        """Cambia el presupuesto de memoria y expulsa lo que sobre."""
+        with self._lock:
+            self.budget_bytes = int(budget_mb * 1024 * 1024)
+            self._evict()
+
+    def get(self, frame_index):
+        """Devuelve el frame (o None) y lo marca como usado recientemente."""
+        with self._lock:
+            frame = self._frames.get(frame_index)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._frames.move_to_end(frame_index)
+            return frame
+
+    def has_room(self, nbytes):
+        """True si caben nbytes más sin expulsar nada."""
+        with self._lock:
+            return self.used_bytes + nbytes <= self.budget_bytes
+
+    def put(self, frame_index, frame):
+        with self._lock:
+            old = self._frames.pop(frame_index, None)
+            if old is not None:
+                self.used_bytes -= old.nbytes
+            self._frames[frame_index] = frame
+            self.used_bytes += frame.nbytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.used_bytes = 0
+
+    def _evict(self):
+        while self.used_bytes > self.budget_bytes and len(self._frames) > 1:
+            _, frame = self._frames.popitem(last=False)
+            self.used_bytes -= frame.nbytes
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'frames': len(self._frames),
+                'used_mb': self.used_bytes / (1024 * 1024),
+                'budget_mb': self.budget_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class BackwardDecoder:
+    """
+    Obtiene frames arbitrarios (sobre todo hacia atrás) con un VideoCapture propio.
+
+    Si el frame no está en caché decodifica el bloque completo desde el keyframe
+    previo hasta el frame pedido y lo guarda en un búfer propio para los pasos
+    siguientes. El bloque no pasa por la caché LRU compartida: con GOPs largos
+    el LRU expulsaría su principio antes de usarlo y cada paso atrás volvería
+    a decodificar el GOP entero.
+    """
+
+    def __init__(self, frame_cache, chunk_size=30):
+        self.frame_cache = frame_cache
+        self.chunk_size = chunk_size  # Tamaño del bloque si no hay índice de keyframes
+        self.seek_index = None
+        self.all_intra = False  # Todos los frames son keyframes: no hace falta decodificar bloques
+        self.path = None
+        self.cap = None
+        self.next_index = None  # Frame que devolvería cap.read() sin reposicionar
+        self._chunk = {}  # Último bloque decodificado: índice -> frame
+        self._lock = threading.Lock()
+
+    def open(self, path):
+        """Asigna el video; el capturador se abre en el primer uso."""
+        with self._lock:
+            self._release()
+            self.path = path
+
+    def close(self):
+        with self._lock:
+            self._release()
+            self.path = None
+
+    def _release(self):
+        if self.cap:
+            self.cap.release()
+        self.cap = None
+        self.next_index = None
+        self._chunk = {}
+
+    def _chunk_start(self, frame_index):
+        if self.all_intra:
+            return frame_index
+        if self.seek_index and self.seek_index.has_keyframes():
+            return self.seek_index.keyframe_before(frame_index)
+        return max(0, frame_index - self.chunk_size + 1)
+
+    def get_frame(self, frame_index):
+        """Frame exacto por índice (0-based) o None si no existe."""
+        if frame_index < 0:
+            return None
+        frame = self.frame_cache.get(frame_index)
+        if frame is not None:
+            return frame
+        with self._lock:
+            frame = self._chunk.get(frame_index)
+            if frame is not None:
+                return frame
+            if self.cap is None:
+                if self.path is None:
+                    return None
+                self.cap = cv2.VideoCapture(self.path)
+                self.next_index = 0
+            if frame_index == self.next_index:
+                # Paso hacia delante: el capturador ya está en la posición
+                ret, frame = self.cap.read()
+                if not ret:
+                    self.next_index = None
+                    return None
+                self.next_index = frame_index + 1
+                self.frame_cache.put(frame_index, frame)
+                return frame
+            return self._decode_chunk(frame_index)
+
+    def _decode_chunk(self, frame_index):
+        """Decodifica desde el keyframe previo hasta el frame, guardando el bloque en el búfer."""
+        start = self._chunk_start(frame_index)
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        # Se libera el bloque anterior antes de decodificar: solo se retiene un GOP
+        self._chunk = {}
+        frame = None
+        for index in range(start, frame_index + 1):
+            ret, decoded = self.cap.read()
+            if not ret:
+                self.next_index = None
+                return None
+            self._chunk[index] = decoded
+            frame = decoded
+        self.next_index = frame_index + 1
+        return frame
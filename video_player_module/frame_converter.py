@@ -0,0 +1,139 @@
+"""
+Conversión de color y escalado de frames en buffers preasignados
+"""
+import time
+import weakref
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage
+
+
+class FrameConverter:
+    """
+    Escala y convierte frames BGR a RGB888 dentro de un conjunto rotativo de
+    buffers reutilizables, devolviendo QImages que envuelven esos buffers sin copiarlos.
+
+    Cada buffer queda prestado a la imagen que lo envuelve: no se reutiliza
+    mientras esa imagen siga viva (en el buzón, en una señal pendiente o
+    pintándose en la GUI). Si todos están prestados el pool crece.
+    """
+
+    MAX_POOL_SIZE = 8  # Por encima se asignan buffers sueltos que no vuelven al pool
+
+    def __init__(self, pool_size=4):
+        self.pool_size = max(2, pool_size)
+        self.target_size = None  # (ancho, alto) del área de dibujo
+        self.timings = {}        # Tiempos de la última conversión (ms)
+        self.roi = None          # Región de interés normalizada (x, y, ancho, alto) o None
+        self._pool = []
+        self._leases = []        # weakref a la imagen que usa cada buffer (o None)
+        self._pool_shape = None
+        self._next = 0
+
+    def set_target_size(self, width, height):
+        """Tamaño disponible para el video (normalmente el del QLabel)."""
+        self.target_size = (max(1, int(width)), max(1, int(height)))
+
+    def set_roi(self, roi):
+        """Zoom digital: sólo se escala y convierte la región indicada."""
+        self.roi = roi
+
+    def crop(self, frame):
+        """
+        Recorta la ROI del frame sin copiar (vista de numpy).
+
+        Returns:
+            (recorte, ROI normalizada ajustada a píxeles enteros o None)
+        """
+        roi = self.roi
+        if roi is None:
+            return frame, None
+        frame_height, frame_width = frame.shape[:2]
+        x0 = int(round(roi[0] * frame_width))
+        y0 = int(round(roi[1] * frame_height))
+        x1 = max(x0 + 1, min(frame_width, int(round((roi[0] + roi[2]) * frame_width))))
+        y1 = max(y0 + 1, min(frame_height, int(round((roi[1] + roi[3]) * frame_height))))
+        exact = (x0 / frame_width, y0 / frame_height, (x1 - x0) / frame_width, (y1 - y0) / frame_height)
+        return frame[y0:y1, x0:x1], exact
+
+    def fit_size(self, frame_width, frame_height):
+        """Tamaño escalado manteniendo la relación de aspecto."""
+        if not self.target_size:
+            return frame_width, frame_height
+        target_w, target_h = self.target_size
+        scale = min(target_w / frame_width, target_h / frame_height)
+        return max(1, int(frame_width * scale)), max(1, int(frame_height * scale))
+
+    def _acquire_buffer(self, width, height):
+        """
+        Buffer libre del pool (índice, buffer); se reasigna el pool sólo si
+        cambia el tamaño. El índice es None para un buffer suelto.
+        """
+        shape = (height, width, 3)
+        if shape != self._pool_shape:
+            self._pool = [np.empty(shape, dtype=np.uint8) for _ in range(self.pool_size)]
+            self._leases = [None] * self.pool_size
+            self._pool_shape = shape
+            self._next = 0
+        count = len(self._pool)
+        for offset in range(count):
+            index = (self._next + offset) % count
+            lease = self._leases[index]
+            if lease is None or lease() is None:
+                self._next = (index + 1) % count
+                return index, self._pool[index]
+        # Todos siguen en uso: nunca se sobrescribe una imagen que la GUI puede estar pintando
+        buffer = np.empty(shape, dtype=np.uint8)
+        if count >= self.MAX_POOL_SIZE:
+            return None, buffer
+        self._pool.append(buffer)
+        self._leases.append(None)
+        return count, buffer
+
+    def convert(self, frame):
+        """
+        Escala y convierte un frame BGR.
+
+        Returns:
+            QImage RGB888 que comparte memoria con un buffer del pool (prestado
+            hasta que la imagen deja de estar referenciada).
+        """
+        frame, roi = self.crop(frame)
+        frame_height, frame_width = frame.shape[:2]
+        width, height = self.fit_size(frame_width, frame_height)
+        index, buffer = self._acquire_buffer(width, height)
+
+        if (width, height) == (frame_width, frame_height):
+            t0 = t1 = time.perf_counter()
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffer)
+            t2 = time.perf_counter()
+            scale_ms, convert_ms = 0.0, (t2 - t1) * 1000
+        elif width < frame_width:
+            # Reducción: escalar primero y convertir el color de menos píxeles
+            t0 = time.perf_counter()
+            scaled = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            t1 = time.perf_counter()
+            cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB, dst=buffer)
+            t2 = time.perf_counter()
+            scale_ms, convert_ms = (t1 - t0) * 1000, (t2 - t1) * 1000
+        else:
+            # Ampliación (p.ej. zoom a una ROI): convertir el recorte y escalar al buffer
+            t0 = time.perf_counter()
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            t1 = time.perf_counter()
+            cv2.resize(rgb, (width, height), dst=buffer, interpolation=cv2.INTER_LINEAR)
+            t2 = time.perf_counter()
+            convert_ms, scale_ms = (t1 - t0) * 1000, (t2 - t1) * 1000
+
+        image = QImage(buffer.data, width, height, buffer.strides[0], QImage.Format_RGB888)
+        # Mantener vivo el buffer mientras exista la imagen (el pool puede reasignarse)
+        image.ndarray = buffer
+        image.roi = roi  # Región del frame que muestra la imagen (para mapear overlays)
+        if index is not None:
+            # El buffer vuelve a estar libre cuando la GUI suelta la imagen
+            self._leases[index] = weakref.ref(image)
+        self.timings = {
+            'scale_ms': scale_ms,
+            'convert_ms': convert_ms,
+        }
+        return image
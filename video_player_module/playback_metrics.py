@@ -0,0 +1,87 @@
+"""
+Métricas de rendimiento de la reproducción
+"""
+import csv
+import threading
+import time
+from collections import deque
+
+
+class PlaybackMetrics:
+    """
+    Tiempos por frame de cada etapa (decodificación, escalado, color, pintado)
+    y cadencia de presentación, en una ventana deslizante.
+
+    Las etapas se registran desde threads distintos (decodificador, thread de
+    video y GUI), por lo que todos los accesos van protegidos por un lock.
+    """
+
+    STAGES = ('decode_ms', 'scale_ms', 'convert_ms', 'paint_ms')
+
+    def __init__(self, window=60):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+        self._presented = deque(maxlen=window)  # Instantes monotónicos de presentación
+
+    def record(self, stage, value_ms):
+        with self._lock:
+            self._samples[stage].append(value_ms)
+
+    def record_timings(self, timings):
+        """Registra los tiempos de un FrameConverter (scale_ms, convert_ms)."""
+        with self._lock:
+            for stage, value in timings.items():
+                if stage in self._samples:
+                    self._samples[stage].append(value)
+
+    def record_presented(self):
+        with self._lock:
+            self._presented.append(time.monotonic())
+
+    def effective_fps(self):
+        """Frames presentados por segundo en la ventana actual."""
+        with self._lock:
+            if len(self._presented) < 2:
+                return 0.0
+            span = self._presented[-1] - self._presented[0]
+            if time.monotonic() - self._presented[-1] > 1.0:
+                return 0.0  # En pausa
+            return (len(self._presented) - 1) / span if span > 0 else 0.0
+
+    def averages(self):
+        """Media de cada etapa en la ventana (ms)."""
+        with self._lock:
+            return {stage: (sum(values) / len(values) if values else 0.0)
+                    for stage, values in self._samples.items()}
+
+    def reset(self):
+        with self._lock:
+            for values in self._samples.values():
+                values.clear()
+            self._presented.clear()
+
+
+class MetricsCsvLogger:
+    """Escribe instantáneas de métricas en un CSV para su análisis posterior."""
+
+    FIELDS = (
+        'timestamp', 'frame', 'decode_ms', 'scale_ms', 'convert_ms', 'paint_ms',
+        'effective_fps', 'source_fps', 'speed', 'dropped_frames', 'queue_depth', 'cache_mb',
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.FIELDS, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, snapshot):
+        self._writer.writerow({key: (round(value, 3) if isinstance(value, float) else value)
+                               for key, value in snapshot.items()})
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+        self._file = None
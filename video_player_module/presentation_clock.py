@@ -0,0 +1,130 @@
+"""
+Reloj de presentación basado en tiempo monotónico
+"""
+import threading
+import time
+
+
+class PresentationClock:
+    """Calcula el instante de presentación de cada frame respecto a un ancla monotónica."""
+
+    MAX_CONSECUTIVE_DROPS = 8  # Descartes seguidos tras los que se presenta y se re-ancla
+
+    def __init__(self, fps=30.0, speed=1.0):
+        self.fps = fps
+        self.speed = speed
+        self.anchor_time = time.monotonic()
+        self.anchor_frame = 0
+        self.dropped_frames = 0
+        self.consecutive_drops = 0
+        self.accumulated_drift = 0.0  # Segundos de retraso acumulado en frames presentados
+        self.presented_frames = 0
+        self.resyncs = 0  # Veces que se re-ancló por ir más de un frame por detrás
+
+    @property
+    def rate(self):
+        """Frames por segundo efectivos (fps * velocidad)."""
+        return max(self.fps * self.speed, 1e-6)
+
+    @property
+    def frame_duration(self):
+        return 1.0 / self.rate
+
+    def start(self, frame_number):
+        """Ancla el reloj: el frame indicado se presenta ahora."""
+        self.anchor_time = time.monotonic()
+        self.anchor_frame = frame_number
+        self.consecutive_drops = 0
+
+    def set_speed(self, speed, current_frame):
+        """Cambia la velocidad re-anclando en el frame actual para no saltar."""
+        self.speed = speed
+        self.start(current_frame)
+
+    def due_time(self, frame_number):
+        """Instante monotónico en el que debe presentarse el frame."""
+        return self.anchor_time + (frame_number - self.anchor_frame) / self.rate
+
+    def time_until(self, frame_number):
+        """Segundos que faltan para presentar el frame (negativo si va tarde)."""
+        return self.due_time(frame_number) - time.monotonic()
+
+    def is_late(self, frame_number):
+        """Un frame va tarde si ya pasó su ventana de presentación completa."""
+        return self.time_until(frame_number) < -self.frame_duration
+
+    def should_drop(self, frame_number):
+        """
+        Indica si el frame debe descartarse por llegar tarde (y lo cuenta).
+
+        Tras MAX_CONSECUTIVE_DROPS descartes seguidos el frame se presenta
+        igualmente: si el decodificador no da abasto la imagen avanza a saltos
+        en vez de congelarse hasta el final o el siguiente seek.
+        """
+        if self.consecutive_drops < self.MAX_CONSECUTIVE_DROPS and self.is_late(frame_number):
+            self.mark_dropped()
+            return True
+        return False
+
+    def mark_dropped(self):
+        self.dropped_frames += 1
+        self.consecutive_drops += 1
+
+    def mark_presented(self, frame_number, time_until=None):
+        """
+        Registra la presentación de un frame y acumula su desvío.
+
+        time_until debe medirse antes de esperar al instante de presentación
+        (tras la espera el desvío sería siempre ~0). Si el frame se presenta
+        fuera de su ventana el reloj se re-ancla en él.
+        """
+        if time_until is None:
+            time_until = self.time_until(frame_number)
+        lateness = max(0.0, -time_until)
+        self.presented_frames += 1
+        self.accumulated_drift += lateness
+        self.consecutive_drops = 0
+        if lateness > self.frame_duration:
+            self.resyncs += 1
+            self.start(frame_number)
+
+    def reset_stats(self):
+        self.dropped_frames = 0
+        self.consecutive_drops = 0
+        self.accumulated_drift = 0.0
+        self.presented_frames = 0
+        self.resyncs = 0
+
+
+class MasterClock:
+    """
+    Posición de reproducción compartida entre threads (segundos del video maestro).
+
+    El thread maestro la actualiza cada vez que presenta un frame; los demás
+    threads la extrapolan con el tiempo monotónico transcurrido desde entonces.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._position = 0.0
+        self._anchor_time = time.monotonic()
+        self._rate = 0.0  # Segundos de video por segundo real (0 en pausa, negativo hacia atrás)
+        self.generation = 0  # Cambia en cada salto (seek) para que los seguidores se reposicionen
+
+    def update(self, position, playing, rate=1.0, jump=False):
+        with self._lock:
+            self._position = position
+            self._anchor_time = time.monotonic()
+            self._rate = rate if playing else 0.0
+            if jump:
+                self.generation += 1
+
+    def position(self):
+        """Posición actual extrapolada."""
+        with self._lock:
+            return self._position + (time.monotonic() - self._anchor_time) * self._rate
+
+    @property
+    def rate(self):
+        with self._lock:
+            return self._rate
@@ -0,0 +1,75 @@
+"""
+Región de interés (zoom digital) y su animación por keyframes
+"""
+import bisect
+
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+
+
+def clamp_roi(roi, min_size=0.05):
+    """
+    Ajusta una ROI (x, y, ancho, alto normalizados) al frame.
+
+    Returns:
+        La ROI ajustada, o None si equivale al frame completo.
+    """
+    if roi is None:
+        return None
+    x, y, width, height = roi
+    width = min(1.0, max(min_size, width))
+    height = min(1.0, max(min_size, height))
+    x = min(max(0.0, x), 1.0 - width)
+    y = min(max(0.0, y), 1.0 - height)
+    if width >= 1.0 and height >= 1.0:
+        return None
+    return (x, y, width, height)
+
+
+def zoom_roi(roi, factor, center_x, center_y):
+    """ROI tras aplicar un factor de zoom (>1 acerca) alrededor de un punto normalizado."""
+    x, y, width, height = roi or FULL_FRAME
+    new_width, new_height = width / factor, height / factor
+    # El punto bajo el cursor se mantiene en la misma posición relativa
+    rel_x = (center_x - x) / width
+    rel_y = (center_y - y) / height
+    return clamp_roi((center_x - rel_x * new_width, center_y - rel_y * new_height, new_width, new_height))
+
+
+class RoiTrack:
+    """ROI animada: keyframes (tiempo en segundos, ROI) con interpolación lineal."""
+
+    def __init__(self, keyframes=None):
+        self.times = []
+        self.rois = []
+        for keyframe in keyframes or []:
+            self.set_keyframe(keyframe['time'], keyframe['roi'])
+
+    def __len__(self):
+        return len(self.times)
+
+    def set_keyframe(self, time, roi, tolerance=1e-3):
+        """Añade o sustituye el keyframe del instante indicado."""
+        roi = tuple(roi) if roi is not None else FULL_FRAME
+        pos = bisect.bisect_left(self.times, time - tolerance)
+        if pos < len(self.times) and abs(self.times[pos] - time) <= tolerance:
+            self.rois[pos] = roi
+        else:
+            self.times.insert(pos, time)
+            self.rois.insert(pos, roi)
+
+    def roi_at(self, time):
+        """ROI interpolada en el instante indicado (None si es el frame completo)."""
+        if not self.times:
+            return None
+        pos = bisect.bisect_right(self.times, time)
+        if pos == 0:
+            return clamp_roi(self.rois[0])
+        if pos == len(self.times):
+            return clamp_roi(self.rois[-1])
+        t0, t1 = self.times[pos - 1], self.times[pos]
+        ratio = (time - t0) / (t1 - t0)
+        r0, r1 = self.rois[pos - 1], self.rois[pos]
+        return clamp_roi(tuple(a + (b - a) * ratio for a, b in zip(r0, r1)))
+
+    def to_list(self):
+        return [{'time': time, 'roi': list(roi)} for time, roi in zip(self.times, self.rois)]
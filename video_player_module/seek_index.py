@@ -0,0 +1,190 @@
+"""
+Índice de keyframes y PTS para búsquedas exactas e instantáneas
+"""
+import os
+import json
+import bisect
+import cv2
+from PyQt5.QtCore import QThread, pyqtSignal
+from utils.cache_utils import video_fingerprint
+from core.timebase import Timebase
+
+
+class SeekIndex:
+    """Posiciones de keyframes y mapeo PTS→frame de un video."""
+
+    VERSION = 1
+
+    def __init__(self, fingerprint=None, fps=30.0, keyframes=None, pts_ms=None):
+        self.fingerprint = fingerprint or {}
+        self.fps = fps
+        self.timebase = Timebase(fps)
+        self.keyframes = keyframes or []  # Índices de frame ordenados
+        self.pts_ms = pts_ms or []        # PTS (ms) de cada frame, en orden de presentación
+
+    @property
+    def frame_count(self):
+        return len(self.pts_ms)
+
+    def has_keyframes(self):
+        return bool(self.keyframes)
+
+    def keyframe_before(self, frame_number):
+        """Keyframe más cercano anterior (o igual) al frame indicado."""
+        if not self.keyframes:
+            return 0
+        pos = bisect.bisect_right(self.keyframes, frame_number) - 1
+        return self.keyframes[max(0, pos)]
+
+    def keyframe_after(self, frame_number):
+        """Primer keyframe posterior (o igual) al frame indicado (None si no hay)."""
+        pos = bisect.bisect_left(self.keyframes, frame_number)
+        return self.keyframes[pos] if pos < len(self.keyframes) else None
+
+    def frame_at_time(self, seconds):
+        """Frame que se presenta en el instante indicado según los PTS reales."""
+        if not self.pts_ms:
+            return self.timebase.frame_at(seconds)
+        pos = bisect.bisect_right(self.pts_ms, seconds * 1000 + 0.5) - 1
+        return max(0, min(pos, len(self.pts_ms) - 1))
+
+    def time_of_frame(self, frame_number):
+        """PTS en segundos de un frame."""
+        if not self.pts_ms:
+            return self.timebase.time_at(frame_number)
+        frame_number = max(0, min(frame_number, len(self.pts_ms) - 1))
+        return self.pts_ms[frame_number] / 1000
+
+    def matches(self, path):
+        """Verificar que el índice corresponde al archivo actual."""
+        try:
+            return video_fingerprint(path) == self.fingerprint
+        except OSError:
+            return False
+
+    def to_dict(self):
+        return {
+            'version': self.VERSION,
+            'fingerprint': self.fingerprint,
+            'fps': self.fps,
+            'keyframes': self.keyframes,
+            'pts_ms': [round(p, 3) for p in self.pts_ms],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            fingerprint=data.get('fingerprint'),
+            fps=data.get('fps', 30.0),
+            keyframes=data.get('keyframes', []),
+            pts_ms=data.get('pts_ms', []),
+        )
+
+    def save(self, file_path):
+        """Guardar el índice en disco."""
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f)
+            return True
+        except OSError as e:
+            print(f"Error guardando índice de búsqueda: {e}")
+            return False
+
+    @classmethod
+    def load(cls, file_path, video_path=None):
+        """Cargar un índice; devuelve None si no existe o no corresponde al video."""
+        if not file_path or not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error cargando índice de búsqueda: {e}")
+            return None
+        if data.get('version') != cls.VERSION:
+            return None
+        index = cls.from_dict(data)
+        if video_path and not index.matches(video_path):
+            return None
+        return index
+
+    @staticmethod
+    def index_path_for_project(project_file):
+        """Ruta del índice persistido junto al archivo de proyecto."""
+        return f"{project_file}.seekindex"
+
+
+def _open_raw_capture(video_path):
+    """Abrir en modo paquete crudo si el backend lo soporta."""
+    try:
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        if cap.isOpened():
+            return cap, True
+    except (cv2.error, TypeError):
+        pass
+    return cv2.VideoCapture(video_path), False
+
+
+def build_seek_index(video_path, progress_callback=None, is_cancelled=None):
+    """
+    Construye el índice leyendo sólo paquetes (sin decodificar).
+
+    Args:
+        progress_callback: función opcional que recibe el porcentaje completado
+        is_cancelled: función opcional que devuelve True para abortar
+
+    Returns:
+        SeekIndex o None si se canceló o no pudo abrirse el video
+    """
+    cap, raw_mode = _open_raw_capture(video_path)
+    if not cap.isOpened():
+        return None
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+    key_prop = getattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME', None)
+
+    keyframes = []
+    pts_ms = []
+    frame_number = 0
+    last_percent = -1
+    cancelled = False
+    while cap.grab():
+        if is_cancelled and is_cancelled():
+            cancelled = True
+            break
+        pts_ms.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+        if raw_mode and key_prop is not None and cap.get(key_prop):
+            keyframes.append(frame_number)
+        frame_number += 1
+
+        percent = min(100, frame_number * 100 // total)
+        if progress_callback and percent != last_percent:
+            last_percent = percent
+            progress_callback(percent)
+    cap.release()
+
+    if cancelled:
+        return None
+    # PTS en orden de presentación (los B-frames pueden llegar desordenados)
+    pts_ms.sort()
+    return SeekIndex(video_fingerprint(video_path), fps, keyframes, pts_ms)
+
+
+class SeekIndexBuilder(QThread):
+    """Construye el índice en segundo plano leyendo sólo paquetes (sin decodificar)."""
+
+    progress = pyqtSignal(int)          # Porcentaje
+    index_ready = pyqtSignal(object)    # SeekIndex
+
+    def __init__(self, video_path):
+        super().__init__()
+        self.video_path = video_path
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        index = build_seek_index(self.video_path, self.progress.emit, lambda: self._cancelled)
+        if index is not None:
+            self.index_ready.emit(index)
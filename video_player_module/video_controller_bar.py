@@ -13,6 +13,7 @@ class VideoControlBar(QWidget):
     
     # Señales personalizadas
     playClicked = pyqtSignal()
+    reversePlayClicked = pyqtSignal()
     pauseClicked = pyqtSignal()
     stopClicked = pyqtSignal()
     previousFrameClicked = pyqtSignal()
@@ -86,6 +87,11 @@ class VideoControlBar(QWidget):
         self.btn_previous.clicked.connect(self.on_previous_clicked)
         left_controls.addWidget(self.btn_previous)
         
+        # Botón reproducir hacia atrás
+        self.btn_reverse = self.create_control_button("◀", "Reproducir hacia atrás", "controlButton")
+        self.btn_reverse.clicked.connect(self.on_reverse_clicked)
+        left_controls.addWidget(self.btn_reverse)
+        
         # Botón Play/Pause (más grande)
         self.btn_play_pause = self.create_control_button("▶", "Reproducir", "playButton")
         self.btn_play_pause.clicked.connect(self.on_play_pause_clicked)
@@ -167,7 +173,7 @@ class VideoControlBar(QWidget):
         
         self.speed_combo = QComboBox()
         self.speed_combo.setObjectName("speedCombo")
-        self.speed_combo.addItems(["0.25x", "0.5x", "0.75x", "1x", "1.25x", "1.5x", "2x"])
+        self.speed_combo.addItems(["0.25x", "0.5x", "0.75x", "1x", "1.25x", "1.5x", "2x", "4x", "8x", "16x"])
         self.speed_combo.setCurrentText("1x")
         self.speed_combo.currentTextChanged.connect(self.on_speed_changed)
         speed_layout.addWidget(self.speed_combo)
@@ -437,6 +443,13 @@ class VideoControlBar(QWidget):
             self.btn_play_pause.setToolTip("Reproducir")
             self.pauseClicked.emit()
             
+    def on_reverse_clicked(self):
+        """Manejar click en reproducir hacia atrás"""
+        self.is_playing = True
+        self.btn_play_pause.setText("⏸")
+        self.btn_play_pause.setToolTip("Pausar")
+        self.reversePlayClicked.emit()
+            
     def on_stop_clicked(self):
         """Manejar click en stop"""
         self.is_playing = False
@@ -531,8 +544,6 @@ class VideoControlBar(QWidget):
         
         # Actualizar slider sin triggear señales
         self.progress_slider.blockSignals(True)
-        print(self.total_frames)
-        #print(self.video_info)
         if self.total_frames > 0:
             progress = int((frame_number / self.total_frames) * 100)
             self.progress_slider.setValue(progress)
@@ -555,13 +566,13 @@ class VideoControlBar(QWidget):
             
             self.total_time_label.setText(f"Frame: {self.current_frame:,}")
             self.current_time_label.setText(current_str)
-            self.current_time_label.repaint()
+            self.current_time_label.update()
         
     def update_time_labels2(self,seconds):
         time = self.format_time(seconds)
         """Actualizar las etiquetas de tiempo"""
         self.current_time_label.setText(time)
-        self.current_time_label.repaint()
+        self.current_time_label.update()
             
     def format_time(self, seconds):
         """Formatear tiempo en HH:MM:SS"""
@@ -0,0 +1,57 @@
+"""
+Superficie de dibujo del video
+"""
+import time
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import QRect, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor
+
+
+class VideoDisplayLabel(QLabel):
+    """QLabel que pinta directamente un QImage ya escalado, sin pasar por QPixmap."""
+
+    resized = pyqtSignal(int, int)
+    painted = pyqtSignal(float)  # Tiempo del último pintado (ms)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image = None
+        self.overlay_painter = None  # Callback (painter, image_rect) para dibujar overlays
+        self.paint_ms = 0.0
+
+    def set_image(self, image):
+        """Muestra una imagen lista para pintar y programa el repintado."""
+        self.image = image
+        self.update()
+
+    def clear(self):
+        self.image = None
+        super().clear()
+        self.update()
+
+    def image_rect(self):
+        """Rectángulo centrado que ocupa la imagen dentro del label."""
+        if self.image is None:
+            return QRect()
+        x = (self.width() - self.image.width()) // 2
+        y = (self.height() - self.image.height()) // 2
+        return QRect(x, y, self.image.width(), self.image.height())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit(self.width(), self.height())
+
+    def paintEvent(self, event):
+        if self.image is None:
+            super().paintEvent(event)
+            return
+        t0 = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0))
+        rect = self.image_rect()
+        painter.drawImage(rect.topLeft(), self.image)
+        if self.overlay_painter:
+            self.overlay_painter(painter, rect)
+        painter.end()
+        self.paint_ms = (time.perf_counter() - t0) * 1000
+        self.painted.emit(self.paint_ms)
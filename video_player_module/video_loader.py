@@ -0,0 +1,133 @@
+"""
+Pipeline asíncrono de carga de video
+"""
+import cv2
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.video_probe import get_video_probe
+from .seek_index import build_seek_index
+
+
+class VideoLoadPipeline(QThread):
+    """
+    Carga un video fuera del thread de la GUI en etapas:
+    sondeo, primer frame, thumbnails del timeline e índice de búsqueda.
+
+    Cada etapa emite su resultado en cuanto está disponible, de modo que el
+    reproductor es utilizable desde que llega el primer frame.
+    """
+
+    STAGE_PROBE = "probe"
+    STAGE_FIRST_FRAME = "first_frame"
+    STAGE_THUMBNAILS = "thumbnails"
+    STAGE_SEEK_INDEX = "seek_index"
+
+    stage_changed = pyqtSignal(str)
+    progress = pyqtSignal(str, int)                 # Etapa, porcentaje
+    probed = pyqtSignal(object)                     # VideoInfo
+    capture_ready = pyqtSignal(object, np.ndarray)  # VideoCapture posicionado en 0, primer frame
+    thumbnail_ready = pyqtSignal(np.ndarray)
+    seek_index_ready = pyqtSignal(object)           # SeekIndex
+    load_failed = pyqtSignal(str)
+    load_cancelled = pyqtSignal()
+
+    def __init__(self, video_path, seek_index=None, playback_path=None):
+        super().__init__()
+        self.video_path = video_path
+        self.playback_path = playback_path or video_path  # Proxy si existe
+        self.seek_index = seek_index  # Índice persistido (se reutiliza si coincide)
+        self._cancelled = False
+
+    def cancel(self):
+        """Solicita la cancelación; las etapas pendientes no se ejecutan."""
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def _begin_stage(self, stage):
+        if self._cancelled:
+            return False
+        self.stage_changed.emit(stage)
+        self.progress.emit(stage, 0)
+        return True
+
+    def run(self):
+        stages = (
+            self._run_probe,
+            self._run_first_frame,
+            self._run_thumbnails,
+            self._run_seek_index,
+        )
+        for stage in stages:
+            if self._cancelled:
+                break
+            if not stage():
+                break
+        if self._cancelled:
+            self.load_cancelled.emit()
+
+    def _run_probe(self):
+        if not self._begin_stage(self.STAGE_PROBE):
+            return False
+        info = get_video_probe().probe(self.video_path)
+        if info is None:
+            self.load_failed.emit(f"No se pudo abrir el video: {self.video_path}")
+            return False
+        self.progress.emit(self.STAGE_PROBE, 100)
+        self.probed.emit(info)
+        return True
+
+    def _run_first_frame(self):
+        if not self._begin_stage(self.STAGE_FIRST_FRAME):
+            return False
+        cap = cv2.VideoCapture(self.playback_path)
+        ret, frame = cap.read()
+        if not ret:
+            cap.release()
+            self.load_failed.emit(f"No se pudo decodificar el video: {self.video_path}")
+            return False
+        # Dejar el capturador listo para que el reproductor empiece en el frame 0
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        if self._cancelled:
+            cap.release()
+            return False
+        self.progress.emit(self.STAGE_FIRST_FRAME, 100)
+        self.capture_ready.emit(cap, frame)
+        return True
+
+    def _run_thumbnails(self):
+        if not self._begin_stage(self.STAGE_THUMBNAILS):
+            return False
+        cap = cv2.VideoCapture(self.playback_path)
+        frame = None
+        # Leer varios frames para obtener uno bueno
+        for i in range(5):
+            if self._cancelled:
+                break
+            ret, decoded = cap.read()
+            if not ret:
+                break
+            frame = decoded
+            self.progress.emit(self.STAGE_THUMBNAILS, (i + 1) * 20)
+        cap.release()
+        if frame is not None and not self._cancelled:
+            self.thumbnail_ready.emit(frame)
+        return True
+
+    def _run_seek_index(self):
+        if not self._begin_stage(self.STAGE_SEEK_INDEX):
+            return False
+        index = self.seek_index
+        if index is None or not index.matches(self.video_path):
+            index = build_seek_index(
+                self.video_path,
+                lambda percent: self.progress.emit(self.STAGE_SEEK_INDEX, percent),
+                self.is_cancelled,
+            )
+        if index is None:
+            return False
+        self.progress.emit(self.STAGE_SEEK_INDEX, 100)
+        self.seek_index_ready.emit(index)
+        return True
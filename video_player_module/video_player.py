@@ -3,12 +3,22 @@ Widget de reproducción de video con OpenCV y PyQt5
 """
 from .video_controller_bar import VideoControlBar 
 from .video_thread import VideoThread
+from .seek_index import SeekIndexBuilder
+from .frame_converter import FrameConverter
+from .video_display import VideoDisplayLabel
+from .video_loader import VideoLoadPipeline
+from .angle_thread import AngleThread
+from .playback_metrics import MetricsCsvLogger
+from .roi import FULL_FRAME, RoiTrack, clamp_roi, zoom_roi
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread
-from PyQt5.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QFont
-import cv2
-import numpy as np
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QSizePolicy
+from PyQt5.QtCore import Qt, QTimer, QRect, pyqtSignal, QThread
+from PyQt5.QtGui import QImage, QPainter, QPen, QColor, QFont
+import time
+from core.video_probe import get_video_probe
+from core.zone_model import Zone, ZoneMap
+from core.timebase import Timebase
+from utils.ui_coalescer import UpdateCoalescer
 
 class VideoPlayerWidget(QWidget):
     """
@@ -29,24 +39,59 @@ class VideoPlayerWidget(QWidget):
     
     position_changed = pyqtSignal(float,int)
     duration_changed = pyqtSignal(float,float,float)
+    seek_index_ready = pyqtSignal(object)
+    stage_timings_changed = pyqtSignal(dict)
+    loop_range_changed = pyqtSignal(float, float)  # Inicio y fin del bucle A-B en segundos (-1 si no hay)
+    playlist_clip_changed = pyqtSignal(int)  # Clip de la playlist en reproducción (-1 al terminar)
+    metrics_updated = pyqtSignal(dict)  # Instantánea de métricas de rendimiento
+    load_failed = pyqtSignal(str)  # Mensaje de error al cargar un video
     
     def __init__(self):
         super().__init__()
         
         self.video_thread = VideoThread()
         self.controls_bar = VideoControlBar()
+        # Información de frame de la barra de controles: como mucho una vez por refresco
+        self.controls_coalescer = UpdateCoalescer(self.controls_bar.update_frame_info, parent=self)
         self.current_frame = None
         self.current_time = None
         self.total_frames = None
         self.fps = None
+        self.timebase = Timebase()
         self.duration = 0
         self.is_playing = False
+        self.seek_index = None
+        self.seek_index_builder = None
+        self.load_pipeline = None
+        self.detached_pipelines = []  # Pipelines cancelados que aún no han terminado
+        self.loading_path = None
+        self.source_path = None    # Archivo original (para exportar)
+        self.playback_path = None  # Archivo usado para reproducir (original o proxy)
+        self.display_converter = FrameConverter(pool_size=2)
+        self.debug_timing = False
+        self.stage_timings = {}
+        self.show_hud = False  # Mostrar las métricas sobre el video
+        self.metrics_enabled = False  # Emitir metrics_updated periódicamente
+        self.metrics = {}  # Última instantánea de métricas
+        self.metrics_logger = None  # MetricsCsvLogger activo
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(500)
+        self.metrics_timer.timeout.connect(self.update_metrics)
         
         # Overlays para dibujo
-        self.zones = []  # Lista de zonas dibujadas
-        self.current_drawing = []  # Puntos del polígono actual
+        self.zone_map = ZoneMap()  # Zonas dibujadas (coordenadas normalizadas del video)
+        self.zone_layer = None  # Capa transparente con las zonas pre-renderizadas
+        self.zone_layer_rect = None  # Rectángulo de imagen para el que se renderizó la capa
+        self.zone_layer_roi = None  # ROI para la que se renderizó la capa
+        
+        # Zoom digital (región de interés)
+        self.roi = None  # ROI manual (x, y, ancho, alto normalizados) o None
+        self.roi_track = None  # RoiTrack del evento en reproducción
+        self._pan_origin = None  # (x, y, ROI) al empezar a arrastrar
+        self.current_drawing = []  # Puntos (normalizados) del polígono actual
         self.is_drawing_mode = False
         self.video_current_position = 0
+        self.angles = []  # (AngleThread, VideoDisplayLabel) de los ángulos secundarios
         self._setup_ui()
         self._connect_signals()
         
@@ -56,7 +101,10 @@ class VideoPlayerWidget(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         
         # Label para mostrar el video
-        self.video_label = QLabel()
+        self.video_label = VideoDisplayLabel()
+        self.video_label.overlay_painter = self.paint_overlays
+        self.video_label.resized.connect(self.on_display_resized)
+        self.video_label.painted.connect(lambda ms: self.video_thread.metrics.record('paint_ms', ms))
         self.video_label.setMinimumSize(640, 480)
         self.video_label.setStyleSheet("background-color: black;")
         self.video_label.setAlignment(Qt.AlignCenter)
@@ -65,18 +113,31 @@ class VideoPlayerWidget(QWidget):
         # Habilitar eventos de mouse para dibujo
         self.video_label.setMouseTracking(True)
         self.video_label.mousePressEvent = self.mouse_press_event
+        self.video_label.mouseDoubleClickEvent = self.mouse_double_click_event
+        self.video_label.wheelEvent = self.wheel_event
         self.video_label.mouseMoveEvent = self.mouse_move_event
         self.video_label.mouseReleaseEvent = self.mouse_release_event
         
         layout.addWidget(self.video_label)
+        
+        # Ángulos secundarios (sincronizados con el video principal)
+        self.angles_widget = QWidget()
+        self.angles_layout = QHBoxLayout(self.angles_widget)
+        self.angles_layout.setContentsMargins(0, 0, 0, 0)
+        self.angles_widget.setVisible(False)
+        layout.addWidget(self.angles_widget)
+        
         layout.addWidget(self.controls_bar)
         self.setLayout(layout)
         
     def _connect_signals(self):
         """Conecta las señales del thread de video."""
-        self.video_thread.frame_ready.connect(self.update_frame)
+        self.video_thread.image_ready.connect(self.on_image_ready)
+        self.video_thread.mailbox_ready.connect(self.on_mailbox_ready)
+        self.video_thread.clip_changed.connect(self.on_playlist_clip_changed)
         self.video_thread.position_changed.connect(self.on_position_update)
         self.controls_bar.playClicked.connect(self.play)
+        self.controls_bar.reversePlayClicked.connect(self.play_reverse)
         self.controls_bar.pauseClicked.connect(self.pause)
         self.controls_bar.stopClicked.connect(self.stop)
         self.controls_bar.speedChanged.connect(self.on_speedChanged)
@@ -89,10 +150,20 @@ class VideoPlayerWidget(QWidget):
         #self.controls_bar.positionChanged.connect(self.update_frame)
         
     def on_previus_frame(self):
-        print("previousFrameClicked") 
+        self.step_frame(-1)
         
     def on_next_frame(self):
-        print("nextFrameClicked")    
+        self.step_frame(1)
+        
+    def step_frame(self, delta):
+        """Avanza o retrocede frames usando la caché de frames decodificados."""
+        if self.is_playing:
+            self.pause()
+        frame = self.video_thread.step_frame(delta)
+        if frame is not None:
+            self.update_frame(frame)
+            frame_num = self.video_thread.current_frame
+            self.on_position_update(self.video_thread.time_at_frame(frame_num), frame_num)
         
     def on_beginning_frame(self):
         print("beginningClicked")      
@@ -100,17 +171,25 @@ class VideoPlayerWidget(QWidget):
     def on_end_frame(self):
         print("endClicked")     
         
-    def load_video(self, path):
-        """Carga un video desde archivo."""
+    def load_video(self, path, seek_index=None):
+        """Carga un video desde archivo (emite load_failed si no puede abrirse)."""
+        self.cancel_loading()
+        info = get_video_probe().probe(path)
+        if info is None:
+            self.load_failed.emit(f"No se pudo abrir el video: {path}")
+            return False
+        self.source_path = path
+        self.playback_path = path
         self.video_thread.load_video(path)
+        self._set_or_build_seek_index(path, seek_index)
         
         # Obtener duración
-        cap = cv2.VideoCapture(path)
-        self.fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        self.fps = info.fps
+        self.timebase = info.timebase
+        self.zone_map.set_resolution(info.width, info.height)
+        frame_count = info.frame_count
         self.total_frames = frame_count
-        self.duration = frame_count / self.fps
-        cap.release()
+        self.duration = info.duration
         
         self.duration_changed.emit(self.duration,frame_count,self.fps)
         
@@ -123,47 +202,325 @@ class VideoPlayerWidget(QWidget):
         self.video_thread.is_playing = False
         self.update_single_frame()
         self.controls_bar.setDisabled(False)
+        return True
+        
+    def load_video_async(self, path, seek_index=None, playback_path=None):
+        """
+        Carga un video sin bloquear la GUI.
+
+        El reproductor se habilita en cuanto llega el primer frame; el índice de
+        búsqueda se activa al terminar su etapa. Devuelve el pipeline sin
+        arrancar: el llamador conecta sus señales (thumbnails, progreso...) y
+        llama a start(), así no se pierde ningún resultado emitido al instante
+        (p.ej. un sondeo en caché).
+        playback_path permite reproducir un proxy en lugar del original.
+        """
+        self.cancel_loading()
+        self._cancel_seek_index_builder()
+        self.seek_index = None
+        self.loading_path = path
+        self.source_path = path
+        self.playback_path = playback_path or path
+        self.load_pipeline = VideoLoadPipeline(path, seek_index, self.playback_path)
+        self.load_pipeline.probed.connect(self._on_load_probed)
+        self.load_pipeline.capture_ready.connect(self._on_load_capture_ready)
+        self.load_pipeline.seek_index_ready.connect(self._on_load_seek_index_ready)
+        return self.load_pipeline
+        
+    def cancel_loading(self):
+        """Cancela la carga asíncrona en curso, si la hay, sin esperar a que termine."""
+        pipeline = self.load_pipeline
+        if pipeline:
+            pipeline.cancel()
+            if pipeline.isRunning():
+                # Se conserva hasta que termine: destruir un QThread en marcha aborta el proceso
+                self.detached_pipelines.append(pipeline)
+                pipeline.finished.connect(lambda: self.detached_pipelines.remove(pipeline))
+            self.load_pipeline = None
+        self.loading_path = None
+        
+    def _is_current_pipeline(self):
+        """Descarta resultados de pipelines cancelados que aún estaban en la cola de eventos."""
+        return self.load_pipeline is not None and self.sender() is self.load_pipeline
+        
+    def _on_load_probed(self, info):
+        if not self._is_current_pipeline():
+            return
+        self.fps = info.fps
+        self.timebase = info.timebase
+        self.zone_map.set_resolution(info.width, info.height)
+        self.total_frames = info.frame_count
+        self.duration = info.duration
+        self.duration_changed.emit(self.duration, info.frame_count, self.fps)
+        
+    def _on_load_capture_ready(self, capture, frame):
+        if not self._is_current_pipeline():
+            capture.release()
+            return
+        self.video_thread.load_video(self.playback_path, capture=capture,
+                                     all_intra=self.is_using_proxy())
+        if not self.video_thread.isRunning():
+            self.video_thread.start()
+        self.is_playing = False
+        self.video_thread.is_playing = False
+        self.update_frame(frame)
+        self.controls_bar.setDisabled(False)
+        
+    def _on_load_seek_index_ready(self, seek_index):
+        if self._is_current_pipeline():
+            self.on_seek_index_ready(seek_index)
+        
+    def is_using_proxy(self):
+        return self.playback_path is not None and self.playback_path != self.source_path
+        
+    def set_playback_source(self, playback_path):
+        """Cambia el archivo usado para reproducir (original o proxy) conservando la posición."""
+        if not self.source_path or playback_path == self.playback_path:
+            return
+        frame_index = self.video_thread.display_index
+        was_playing = self.is_playing
+        if was_playing:
+            self.pause()
+        self.playback_path = playback_path
+        self.video_thread.load_video(playback_path, all_intra=self.is_using_proxy())
+        if self.seek_index:
+            self.video_thread.set_seek_index(self.seek_index)
+        self.video_thread.seek_to_frame(frame_index)
+        self.update_single_frame()
+        if was_playing:
+            self.play()
+        
+    def _set_or_build_seek_index(self, path, seek_index):
+        """Usa el índice persistido si corresponde al video o lo construye en segundo plano."""
+        self._cancel_seek_index_builder()
+        if seek_index and seek_index.matches(path):
+            self.on_seek_index_ready(seek_index)
+            return
+        self.seek_index = None
+        self.seek_index_builder = SeekIndexBuilder(path)
+        self.seek_index_builder.index_ready.connect(self.on_seek_index_ready)
+        self.seek_index_builder.start()
+        
+    def _cancel_seek_index_builder(self):
+        if self.seek_index_builder and self.seek_index_builder.isRunning():
+            self.seek_index_builder.index_ready.disconnect(self.on_seek_index_ready)
+            self.seek_index_builder.cancel()
+            self.seek_index_builder.wait()
+        self.seek_index_builder = None
+        
+    def on_seek_index_ready(self, seek_index):
+        """Activa el índice de búsqueda una vez construido."""
+        self.seek_index = seek_index
+        self.video_thread.set_seek_index(seek_index)
+        self.seek_index_ready.emit(seek_index)
+        
+    def on_image_ready(self, image, frame):
+        """Muestra una imagen ya convertida y escalada por el thread de video."""
+        self.current_frame = frame
+        self.video_label.set_image(image)
+        self.video_thread.metrics.record_presented()
+        if self.debug_timing:
+            self._emit_stage_timings(self.video_thread.converter)
+        
+    def on_mailbox_ready(self):
+        """Pinta sólo el frame más reciente del buzón del thread de video."""
+        item = self.video_thread.mailbox.take()
+        if item:
+            image, frame, position, frame_num = item
+            self.on_image_ready(image, frame)
+            self.on_position_update(position, frame_num)
         
     def update_frame(self, frame):
         """Actualiza el frame mostrado."""
         self.current_frame = frame
         
-        # Convertir a QImage
-        height, width, channel = frame.shape
-        bytes_per_line = 3 * width
-        
-        # Convertir BGR a RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        q_image = QImage(frame_rgb.data, width, height, 
-                        bytes_per_line, QImage.Format_RGB888)
-        
-        # Escalar para ajustar al widget
-        pixmap = QPixmap.fromImage(q_image)
-        scaled_pixmap = pixmap.scaled(
-            self.video_label.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        
-        # Dibujar overlays si existen
-        if self.zones or self.current_drawing:
-            scaled_pixmap = self.draw_overlays(scaled_pixmap)
+        # Escalar y convertir BGR a RGB en un buffer reutilizable
+        if self.roi_track is not None:
+            self.display_converter.set_roi(self.roi_track.roi_at(self.video_thread.current_position))
+        image = self.display_converter.convert(frame)
+        self.video_label.set_image(image)
+        self.video_thread.metrics.record_timings(self.display_converter.timings)
+        if self.debug_timing:
+            self._emit_stage_timings(self.display_converter)
             
-        self.video_label.setPixmap(scaled_pixmap)
-        
-    def draw_overlays(self, pixmap):
-        """Dibuja las zonas y elementos sobre el video."""
-        painter = QPainter(pixmap)
+    def on_display_resized(self, width, height):
+        """Ajusta el tamaño de escalado al nuevo tamaño del label."""
+        self.video_thread.converter.set_target_size(width, height)
+        self.display_converter.set_target_size(width, height)
+        self.invalidate_zone_layer()
+        self._refresh_paused_frame()
+        
+    def set_ui_update_interval(self, interval_ms=None):
+        """Intervalo mínimo (ms) entre actualizaciones de la barra de controles (None: refresco de pantalla)."""
+        self.controls_coalescer.set_interval(interval_ms)
+        
+    def set_debug_timing(self, enabled):
+        """Activa el desglose de tiempos por etapa (escalado, color, pintado)."""
+        self.debug_timing = enabled
+        
+    def set_metrics_enabled(self, enabled):
+        """Activa la emisión periódica de metrics_updated."""
+        self.metrics_enabled = enabled
+        self._update_metrics_timer()
+        
+    def set_hud_visible(self, visible):
+        """Muestra u oculta el HUD de rendimiento sobre el video."""
+        self.show_hud = visible
+        self._update_metrics_timer()
+        self.video_label.update()
+        
+    def start_metrics_log(self, path):
+        """Empieza a registrar las métricas en un CSV."""
+        self.stop_metrics_log()
+        self.metrics_logger = MetricsCsvLogger(path)
+        self._update_metrics_timer()
+        
+    def stop_metrics_log(self):
+        if self.metrics_logger:
+            self.metrics_logger.close()
+            self.metrics_logger = None
+            self._update_metrics_timer()
+            
+    def _update_metrics_timer(self):
+        """El muestreo sólo corre si alguien consume las métricas."""
+        if self.metrics_enabled or self.show_hud or self.metrics_logger:
+            if not self.metrics_timer.isActive():
+                self.metrics_timer.start()
+        else:
+            self.metrics_timer.stop()
+            
+    def collect_metrics(self):
+        """Instantánea de las métricas de reproducción."""
+        thread = self.video_thread
+        snapshot = {'timestamp': time.time(), 'frame': thread.current_frame}
+        snapshot.update(thread.metrics.averages())
+        snapshot.update({
+            'effective_fps': thread.metrics.effective_fps(),
+            'source_fps': thread.fps,
+            'speed': thread.speed,
+            'dropped_frames': thread.get_dropped_frames(),
+            'queue_depth': thread.frame_buffer.depth,
+            'cache_mb': thread.get_cache_memory_mb(),
+        })
+        return snapshot
+        
+    def update_metrics(self):
+        """Recoge, emite y (si procede) registra las métricas."""
+        self.metrics = self.collect_metrics()
+        self.metrics_updated.emit(self.metrics)
+        if self.metrics_logger:
+            self.metrics_logger.write(self.metrics)
+        if self.show_hud:
+            self.video_label.update()
+            
+    def _paint_hud(self, painter, image_rect):
+        """Dibuja el HUD de métricas en la esquina superior izquierda del video."""
+        m = self.metrics
+        lines = [
+            f"decode {m['decode_ms']:.1f} ms  scale {m['scale_ms']:.1f} ms",
+            f"color {m['convert_ms']:.1f} ms  paint {m['paint_ms']:.1f} ms",
+            f"fps {m['effective_fps']:.1f} / {m['source_fps'] * m['speed']:.1f}  drops {m['dropped_frames']}",
+            f"cola {m['queue_depth']}  caché {m['cache_mb']:.0f} MB",
+        ]
+        painter.setFont(QFont("Monospace", 9))
+        line_height = painter.fontMetrics().height()
+        box = QRect(image_rect.x() + 8, image_rect.y() + 8,
+                    max(painter.fontMetrics().width(line) for line in lines) + 12, line_height * len(lines) + 8)
+        painter.fillRect(box, QColor(0, 0, 0, 160))
+        painter.setPen(QColor(0, 255, 0))
+        for i, line in enumerate(lines):
+            painter.drawText(box.x() + 6, box.y() + 4 + line_height * (i + 1) - painter.fontMetrics().descent(), line)
+        
+    def _emit_stage_timings(self, converter):
+        timings = dict(converter.timings)
+        timings['paint_ms'] = self.video_label.paint_ms
+        self.stage_timings = timings
+        self.stage_timings_changed.emit(timings)
+        
+    def invalidate_zone_layer(self):
+        """Descarta la capa de zonas; se regenera en el siguiente pintado."""
+        self.zone_layer = None
+        
+    def current_roi(self):
+        """ROI de la imagen mostrada (None si es el frame completo)."""
+        image = self.video_label.image
+        if image is not None and hasattr(image, 'roi'):
+            return image.roi
+        return self.roi
+        
+    def _to_label_points(self, points, image_rect):
+        """Convierte puntos normalizados del video a coordenadas del label (según la ROI mostrada)."""
+        rx, ry, rw, rh = self.current_roi() or FULL_FRAME
+        return [(int(image_rect.x() + (x - rx) / rw * image_rect.width()),
+                 int(image_rect.y() + (y - ry) / rh * image_rect.height()))
+                for x, y in points]
+        
+    def _to_normalized_point(self, x, y):
+        """Convierte una posición del label a coordenadas normalizadas del video (None si está fuera)."""
+        rect = self.video_label.image_rect()
+        if rect.isEmpty() or not rect.contains(x, y):
+            return None
+        rx, ry, rw, rh = self.current_roi() or FULL_FRAME
+        return (rx + (x - rect.x()) / rect.width() * rw, ry + (y - rect.y()) / rect.height() * rh)
+        
+    def set_roi(self, roi):
+        """
+        Zoom digital a una región del frame (x, y, ancho, alto normalizados).
+        
+        El recorte se hace sobre el frame decodificado antes de convertir y
+        escalar, así que acercarse reduce el trabajo por frame. Sustituye a la
+        ROI animada del evento, si la había.
+        """
+        self.roi = clamp_roi(roi)
+        self.roi_track = None
+        self.video_thread.set_roi_track(None)
+        self.video_thread.converter.set_roi(self.roi)
+        self.display_converter.set_roi(self.roi)
+        self._refresh_paused_frame()
+        
+    def reset_zoom(self):
+        self.set_roi(None)
+        
+    def set_roi_track(self, keyframes):
+        """
+        ROI animada por keyframes [{'time': s, 'roi': [x, y, w, h]}, ...].
+        
+        Sin keyframes se vuelve a la ROI manual.
+        """
+        self.roi_track = RoiTrack(keyframes) if keyframes else None
+        self.video_thread.set_roi_track(self.roi_track)
+        if self.roi_track is None:
+            self.video_thread.converter.set_roi(self.roi)
+            self.display_converter.set_roi(self.roi)
+        self._refresh_paused_frame()
+        
+    def _refresh_paused_frame(self):
+        if not self.is_playing and self.video_thread.cap:
+            self.redraw_current_frame()
+            
+    def redraw_current_frame(self):
+        """
+        Vuelve a convertir el frame mostrado (p.ej. tras cambiar tamaño o ROI)
+        a partir del frame en memoria, sin ninguna lectura del decodificador.
+        """
+        frame = self.video_thread.display_frame
+        if frame is not None:
+            self.update_frame(frame)
+        
+    def _render_zone_layer(self, size, image_rect):
+        """Pre-renderiza las zonas guardadas en una imagen transparente del tamaño del label."""
+        layer = QImage(size, QImage.Format_ARGB32_Premultiplied)
+        layer.fill(Qt.transparent)
+        painter = QPainter(layer)
         painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(QFont("Arial", 12, QFont.Bold))
         
-        # Dibujar zonas guardadas
-        for zone in self.zones:
-            pen = QPen(QColor(zone['color']), 2)
+        for zone in self.zone_map:
+            pen = QPen(QColor(zone.color), 2)
             painter.setPen(pen)
             
             # Dibujar polígono
-            points = zone['points']
+            points = self._to_label_points(zone.points, image_rect)
             for i in range(len(points)):
                 p1 = points[i]
                 p2 = points[(i + 1) % len(points)]
@@ -171,23 +528,43 @@ class VideoPlayerWidget(QWidget):
                 
             # Dibujar nombre de la zona
             if points:
-                painter.setFont(QFont("Arial", 12, QFont.Bold))
                 center_x = sum(p[0] for p in points) / len(points)
                 center_y = sum(p[1] for p in points) / len(points)
-                painter.drawText(int(center_x), int(center_y), zone['name'])
+                painter.drawText(int(center_x), int(center_y), zone.name)
+        painter.end()
+        return layer
+        
+    def paint_overlays(self, painter, image_rect):
+        """Dibuja las zonas y elementos sobre el video."""
+        if len(self.zone_map) or self.current_drawing:
+            self._paint_zones(painter, image_rect)
+        if self.show_hud and self.metrics:
+            self._paint_hud(painter, image_rect)
+            
+    def _paint_zones(self, painter, image_rect):
+        """Zonas guardadas y polígono en construcción."""
+        # Zonas guardadas: se componen desde la capa cacheada
+        if len(self.zone_map):
+            size = self.video_label.size()
+            roi = self.current_roi()
+            if self.zone_layer is None or self.zone_layer.size() != size or self.zone_layer_rect != image_rect \
+                    or self.zone_layer_roi != roi:
+                self.zone_layer = self._render_zone_layer(size, image_rect)
+                self.zone_layer_rect = QRect(image_rect)
+                self.zone_layer_roi = roi
+            painter.drawImage(0, 0, self.zone_layer)
         
         # Dibujar polígono en construcción
         if self.current_drawing:
+            painter.setRenderHint(QPainter.Antialiasing)
             pen = QPen(QColor(255, 255, 0), 2, Qt.DashLine)
             painter.setPen(pen)
             
-            for i in range(len(self.current_drawing) - 1):
-                p1 = self.current_drawing[i]
-                p2 = self.current_drawing[i + 1]
+            points = self._to_label_points(self.current_drawing, image_rect)
+            for i in range(len(points) - 1):
+                p1 = points[i]
+                p2 = points[i + 1]
                 painter.drawLine(p1[0], p1[1], p2[0], p2[1])
-                
-        painter.end()
-        return pixmap
         
     def play(self):
         """Inicia la reproducción del video."""
@@ -195,6 +572,12 @@ class VideoPlayerWidget(QWidget):
         self.video_thread.play()
         self.playClicked.emit()
         
+    def play_reverse(self):
+        """Inicia la reproducción hacia atrás."""
+        self.is_playing = True
+        self.video_thread.play(direction=-1)
+        self.playClicked.emit()
+        
     def pause(self):
         """Pausa la reproducción."""
         self.is_playing = False
@@ -210,7 +593,12 @@ class VideoPlayerWidget(QWidget):
         
     def set_position(self, position):
         """Establece la posición de reproducción (en segundos)."""
-        self.video_thread.seek(position)
+        self.set_frame_position(self.video_thread.frame_at_time(position))
+            
+    def set_frame_position(self, frame_index):
+        """Salta al frame indicado (0-based) sin pasar por segundos."""
+        self.video_thread.seek_to_frame(frame_index)
+        self.video_thread.current_position = self.video_thread.time_at_frame(frame_index)
         if not self.is_playing:
             self.update_single_frame()
             
@@ -222,27 +610,127 @@ class VideoPlayerWidget(QWidget):
         """Obtiene la duración total del video."""
         return self.duration
         
+    def set_loop_range(self, start_time, end_time):
+        """Reproduce en bucle (A-B) el rango indicado en segundos."""
+        if end_time <= start_time:
+            return
+        self.set_loop_frames(self.video_thread.frame_at_time(start_time),
+                             self.video_thread.frame_at_time(end_time))
+            
+    def set_loop_frames(self, start_frame, end_frame):
+        """Reproduce en bucle los frames [start_frame, end_frame) (0-based)."""
+        if not self.video_thread.cap or end_frame <= start_frame:
+            return
+        self.video_thread.set_loop(start_frame, end_frame - 1)
+        self.loop_range_changed.emit(self.video_thread.time_at_frame(start_frame),
+                                     self.video_thread.time_at_frame(end_frame))
+        if not self.is_playing:
+            self.play()
+            
+    def clear_loop(self):
+        """Desactiva el bucle A-B."""
+        if self.video_thread.loop_range is not None:
+            self.video_thread.clear_loop()
+            self.loop_range_changed.emit(-1.0, -1.0)
+            
+    def set_loop_budget(self, budget_mb):
+        """Memoria máxima (MB) para conservar los frames del bucle A-B."""
+        self.video_thread.set_loop_budget(budget_mb)
+            
+    def play_playlist(self, ranges):
+        """Reproduce seguidos los rangos [(inicio, fin), ...] en segundos."""
+        self.play_playlist_frames([(self.video_thread.frame_at_time(start_time),
+                                    self.video_thread.frame_at_time(end_time))
+                                   for start_time, end_time in ranges])
+            
+    def play_playlist_frames(self, ranges):
+        """Reproduce seguidos los rangos de frames [(inicio, fin), ...] con fin exclusivo."""
+        if not self.video_thread.cap:
+            return
+        clips = [(start_frame, end_frame - 1) for start_frame, end_frame in ranges if end_frame > start_frame]
+        if not clips:
+            return
+        self.clear_loop()
+        self.video_thread.set_playlist(clips)
+        if not self.is_playing:
+            self.play()
+            
+    def stop_playlist(self):
+        """Abandona el modo playlist (la reproducción continúa libremente)."""
+        if self.video_thread.playlist:
+            self.video_thread.clear_playlist()
+            self.playlist_clip_changed.emit(-1)
+            
+    def on_playlist_clip_changed(self, index):
+        if index < 0:
+            self.is_playing = False
+        self.playlist_clip_changed.emit(index)
+            
+    def add_angle(self, path, offset=0.0, reduced=True, playback_path=None):
+        """
+        Añade un ángulo secundario que sigue al video principal.
+        
+        Args:
+            offset: segundos que se suman a la posición del principal
+            reduced: presentar a resolución y cadencia reducidas (ahorra CPU)
+            playback_path: proxy de baja resolución del ángulo, si existe
+        """
+        label = VideoDisplayLabel()
+        label.setMinimumSize(240, 135)
+        label.setMaximumHeight(240 if reduced else 16777215)
+        label.setStyleSheet("background-color: black;")
+        label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        
+        thread = AngleThread(path, self.video_thread.master_clock, offset, reduced, playback_path)
+        thread.converter.set_target_size(label.width(), label.height())
+        label.resized.connect(thread.converter.set_target_size)
+        thread.mailbox_ready.connect(lambda: self._on_angle_mailbox_ready(thread, label))
+        
+        self.angles.append((thread, label))
+        self.angles_layout.addWidget(label)
+        self.angles_widget.setVisible(True)
+        thread.start()
+        return len(self.angles) - 1
+        
+    def _on_angle_mailbox_ready(self, thread, label):
+        image = thread.mailbox.take()
+        if image is not None:
+            label.set_image(image)
+            
+    def set_angle_offset(self, index, offset):
+        """Cambia el desfase (segundos) de un ángulo secundario."""
+        if 0 <= index < len(self.angles):
+            self.angles[index][0].set_offset(offset)
+            
+    def remove_angles(self):
+        """Detiene y quita todos los ángulos secundarios."""
+        for thread, label in self.angles:
+            thread.stop()
+            self.angles_layout.removeWidget(label)
+            label.deleteLater()
+        self.angles = []
+        self.angles_widget.setVisible(False)
+        
+    def is_looping(self):
+        return self.video_thread.loop_range is not None
+        
     def set_playback_speed(self, speed):
         """Ajusta la velocidad de reproducción."""
-        if speed > 0:
-            self.video_thread.frame_delay = int((1000 / self.video_thread.fps) / speed)
+        self.video_thread.set_speed(speed)
             
     def update_single_frame(self):
         """Actualiza un solo frame cuando está pausado."""
         if self.video_thread.cap:
-            ret, frame = self.video_thread.cap.read()
-            if ret:
+            frame = self.video_thread.get_display_frame()
+            if frame is not None:
                 self.update_frame(frame)
-                # Retroceder un frame para mantener la posición
-                current_pos = self.video_thread.cap.get(cv2.CAP_PROP_POS_FRAMES)
-                self.video_thread.cap.set(cv2.CAP_PROP_POS_FRAMES, current_pos - 1)
                 
     def on_position_update(self, position, frame_num):
         """Maneja la actualización de posición desde el thread."""
         self.current_time = position
         self.current_frame = frame_num
         self.video_current_position = position
-        self.controls_bar.update_frame_info(frame_num)
+        self.controls_coalescer.post(frame_num)
         self.position_changed.emit(position,frame_num)
         
     def toggle_drawing_mode(self):
@@ -254,54 +742,90 @@ class VideoPlayerWidget(QWidget):
         """Maneja clicks del mouse para dibujo de zonas."""
         if self.is_drawing_mode and event.button() == Qt.LeftButton:
             # Añadir punto al polígono actual
-            pos = (event.x(), event.y())
+            pos = self._to_normalized_point(event.x(), event.y())
+            if pos is None:
+                return
             self.current_drawing.append(pos)
             
-            # Actualizar visualización
-            if not self.is_playing:
-                self.update_single_frame()
+            # Sólo cambian los overlays: repintar sin reconvertir el frame
+            self.video_label.update()
                 
         elif event.button() == Qt.RightButton and self.current_drawing:
             # Cerrar polígono y guardar zona
             if len(self.current_drawing) >= 3:
                 self.save_current_zone()
                 
+        elif event.button() == Qt.LeftButton and self.current_roi():
+            # Empezar a desplazar la ROI
+            self._pan_origin = (event.x(), event.y(), self.current_roi())
+                
     def save_current_zone(self):
         """Guarda la zona dibujada actual."""
         if self.current_drawing:
-            zone = {
-                'name': f"Zona {len(self.zones) + 1}",
-                'points': self.current_drawing.copy(),
-                'color': '#4CAF50'
-            }
-            self.zones.append(zone)
+            zone = Zone(name=f"Zona {len(self.zone_map) + 1}", points=self.current_drawing.copy())
+            self.zone_map.add_zone(zone)
             self.current_drawing = []
-            
-            if not self.is_playing:
-                self.update_single_frame()
+            self.invalidate_zone_layer()
+            self.video_label.update()
                 
     def mouse_move_event(self, event):
-        """Maneja el movimiento del mouse."""
-        pass  # Puede usarse para preview de líneas
+        """Maneja el movimiento del mouse (desplazamiento de la ROI)."""
+        if self._pan_origin is None:
+            return
+        rect = self.video_label.image_rect()
+        if rect.isEmpty():
+            return
+        origin_x, origin_y, (rx, ry, rw, rh) = self._pan_origin
+        dx = (event.x() - origin_x) / rect.width() * rw
+        dy = (event.y() - origin_y) / rect.height() * rh
+        self.set_roi((rx - dx, ry - dy, rw, rh))
         
     def mouse_release_event(self, event):
         """Maneja la liberación del botón del mouse."""
-        pass
+        self._pan_origin = None
+        
+    def mouse_double_click_event(self, event):
+        """Doble click fuera del modo dibujo: quitar el zoom."""
+        if not self.is_drawing_mode:
+            self.reset_zoom()
+            
+    def wheel_event(self, event):
+        """Rueda del ratón: zoom digital centrado en el cursor."""
+        center = self._to_normalized_point(event.x(), event.y())
+        if center is None:
+            return
+        factor = 1.25 ** (event.angleDelta().y() / 120)
+        self.set_roi(zoom_roi(self.current_roi(), factor, *center))
     
     def on_speedChanged(self, speed):
         self.speedChanged.emit(speed)
         
     def clear_video(self):
         """Limpia el video cargado y resetea el thread."""
+        self.cancel_loading()
+        self._cancel_seek_index_builder()
+        self.seek_index = None
+        self.source_path = None
+        self.playback_path = None
+        self.clear_loop()
+        self.stop_playlist()
+        self.remove_angles()
+        self.metrics = {}
         self.video_thread.resetThread()
+        self.roi = None
+        self.roi_track = None
+        self.video_thread.converter.set_roi(None)
+        self.display_converter.set_roi(None)
         self.current_frame = None
         self.current_time = None
         self.total_frames = None
         self.fps = None
+        self.timebase = Timebase()
         self.duration = 0
         self.is_playing = False
         self.video_label.clear()
         self.controls_bar.setDisabled(True)
-        self.zones = []
+        self.zone_map.clear()
+        self.zone_layer = None
         self.current_drawing = []
         self.is_drawing_mode = False
\ No newline at end of file
@@ -1,69 +1,691 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread
 from PyQt5.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QFont
+import threading
+import time
 import cv2
 import numpy as np
+from .frame_buffer import FrameRingBuffer, FrameMailbox
+from .presentation_clock import PresentationClock, MasterClock
+from .frame_converter import FrameConverter
+from .frame_cache import FrameCache, BackwardDecoder
+from .clip_prefetcher import ClipPrefetcher
+from .playback_metrics import PlaybackMetrics
+from core.timebase import Timebase
+
+
+class DecodeAheadThread(QThread):
+    """Thread que decodifica frames por adelantado y llena el buffer circular."""
+
+    def __init__(self, video_thread):
+        super().__init__()
+        self.video_thread = video_thread
+        self.end_of_stream = False
+
+    def run(self):
+        """Loop de decodificación adelantada."""
+        video_thread = self.video_thread
+        buffer = video_thread.frame_buffer
+        pending = None
+        while video_thread.cap is not None:
+            if pending is None:
+                with video_thread.cap_lock:
+                    cap = video_thread.cap
+                    if cap is None:
+                        break
+                    generation = video_thread._apply_pending_seek()
+                    t0 = time.perf_counter()
+                    ret, frame = video_thread._decode_next(cap)
+                    frame_pos = video_thread.next_frame
+                if not ret:
+                    self.end_of_stream = True
+                    self.msleep(20)
+                    continue
+                video_thread.metrics.record('decode_ms', (time.perf_counter() - t0) * 1000)
+                pending = (frame_pos, frame, generation)
+
+            frame_pos, frame, generation = pending
+            if buffer.put(frame_pos, frame, generation):
+                pending = None
+            elif generation != buffer.generation:
+                # Hubo un seek mientras se decodificaba: descartar el frame
+                pending = None
+
+
 class VideoThread(QThread):
     """Thread para procesamiento de video sin bloquear la UI."""
+    FAST_FORWARD_SPEED = 2.0
+    SCAN_SPEED = 16.0
+    PREFETCH_SECONDS = 1.0  # Duración precargada del inicio de cada clip de la playlist
     frame_ready = pyqtSignal(np.ndarray)
+    image_ready = pyqtSignal(object, np.ndarray)  # QImage listo para pintar, frame original
     position_changed = pyqtSignal(float,int)
-    
-    def __init__(self):
+    timing_stats = pyqtSignal(float, int)  # Desvío acumulado (ms), frames descartados
+    mailbox_ready = pyqtSignal()  # Hay un frame nuevo en el buzón
+    clip_changed = pyqtSignal(int)  # Clip de la playlist en reproducción (-1 al terminar)
+
+    def __init__(self, buffer_size=32):
         super().__init__()
         self.cap = None
+        self.cap_lock = threading.Lock()
+        self.seek_lock = threading.Lock()  # Protege pending_seek junto con la generación del buffer
+        self.pending_seek = None  # Frame en el que el decodificador debe reposicionarse (en su thread)
+        self.frame_buffer = FrameRingBuffer(buffer_size)
+        self.decoder = DecodeAheadThread(self)
+        self.converter = FrameConverter()
+        self.mailbox = FrameMailbox()
+        self.use_mailbox = True  # El frame más reciente sustituye al pendiente
+        self.frame_cache = FrameCache()
+        self.backward_decoder = BackwardDecoder(self.frame_cache)
+        self.display_index = 0  # Índice (0-based) del frame mostrado
+        self.display_frame = None  # Frame decodificado mostrado (válido si coincide con display_index)
+        self._display_frame_index = -1
+        self.direction = 1  # 1 hacia delante, -1 hacia atrás
+        self._needs_resync = False  # El buffer no está alineado con display_index
+        self.seek_index = None
+        self.all_intra = False
+        self.next_frame = 0  # Índice del próximo frame que entregará el decodificador
         self.is_playing = False
         self.current_position = 0
         self.current_frame = 0
         self.fps = 30
+        self.timebase = Timebase(self.fps)  # Conversión exacta frame <-> segundos
+        self.speed = 1.0
         self.frame_delay = 33  # milliseconds
-        
-    def load_video(self, path):
-        """Carga un video desde archivo."""
-        if self.cap:
-            self.cap.release()
-            
-        self.cap = cv2.VideoCapture(path)
-        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-        self.frame_delay = int(1000 / self.fps)
-        
-    def play(self):
-        """Inicia la reproducción."""
+        self.loop_cache = FrameCache(budget_mb=512)  # Frames del rango A-B
+        self.loop_range = None  # (primer, último) índice 0-based del bucle A-B
+        self.prefetch_cache = FrameCache(budget_mb=256)  # Primeros frames del siguiente clip
+        self.prefetcher = ClipPrefetcher(self.prefetch_cache)
+        self.playlist = []  # Rangos (inicio, fin) 0-based de la playlist
+        self.playlist_pos = -1
+        self._ram_cache = None  # Caché desde la que se reproduce sin decodificar
+        self._ram_limit = -1  # Último índice que puede servirse desde _ram_cache
+        self.decode_stride = 1  # Se recupera 1 de cada N frames (avance rápido)
+        self.scan_mode = False  # Avance por keyframes (16x)
+        self.clock = PresentationClock(self.fps, self.speed)
+        self._reanchor_clock = True
+        self.master_clock = MasterClock()  # Posición compartida con los ángulos secundarios
+        self.metrics = PlaybackMetrics()
+        self.roi_track = None  # RoiTrack del evento en reproducción
+
+    def load_video(self, path, capture=None, all_intra=False):
+        """
+        Carga un video desde archivo (o usa un capturador ya abierto en otro thread).
+
+        all_intra indica que todos los frames son keyframes (p.ej. un proxy MJPEG),
+        así que las búsquedas se hacen directamente sin avanzar desde un keyframe.
+        """
+        with self.cap_lock:
+            if self.cap:
+                self.cap.release()
+
+            self.cap = capture if capture is not None else cv2.VideoCapture(path)
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+            self.timebase = Timebase(self.fps)
+            self.frame_delay = int(1000 / self.fps / self.speed)
+            self.clock.fps = self.fps
+            self.clock.reset_stats()
+            self._reanchor_clock = True
+            self.pending_seek = None
+            self.frame_buffer.flush()
+            self.frame_buffer.reset_stats()
+            self.mailbox.clear()
+            self.mailbox.reset_stats()
+            self.metrics.reset()
+            self.decoder.end_of_stream = False
+            self.seek_index = None
+            self.next_frame = 0
+            self.display_index = 0
+            self._needs_resync = False
+            self.all_intra = all_intra
+            self.frame_cache.clear()
+            self._set_display_frame(-1, None)
+            self.loop_cache.clear()
+            self.prefetch_cache.clear()
+            self.loop_range = None
+            self.playlist = []
+            self.playlist_pos = -1
+            self._ram_cache = None
+        self.backward_decoder.open(path)
+        self.backward_decoder.seek_index = None
+        self.backward_decoder.all_intra = all_intra
+        self.prefetcher.open(path, None, all_intra)
+
+        if not self.decoder.isRunning():
+            self.decoder.start()
+
+    def play(self, direction=1):
+        """Inicia la reproducción (direction=-1 para reproducir hacia atrás)."""
+        self.direction = direction
+        if direction > 0 and self._needs_resync:
+            # Tras pasos con la caché, realinear el decodificador con el frame mostrado
+            self.seek_to_frame(self.display_index + 1)
+        self._reanchor_clock = True
         self.is_playing = True
-        
+
     def pause(self):
         """Pausa la reproducción."""
         self.is_playing = False
-        
+        self.master_clock.update(self.current_position, False)
+
+    def set_speed(self, speed):
+        """
+        Ajusta la velocidad de reproducción re-anclando el reloj de presentación.
+
+        A partir de FAST_FORWARD_SPEED sólo se recupera uno de cada N frames
+        (los demás se saltan con grab()), y a partir de SCAN_SPEED se salta de
+        keyframe en keyframe, de modo que el coste por frame mostrado es constante.
+        """
+        if speed > 0:
+            previous_mode = (self.decode_stride, self.scan_mode)
+            self.speed = speed
+            self.clock.speed = speed
+            self.decode_stride = max(1, int(round(speed))) if speed >= self.FAST_FORWARD_SPEED else 1
+            self.scan_mode = speed >= self.SCAN_SPEED
+            self.frame_delay = int((1000 / self.fps) / speed)
+            self._reanchor_clock = True
+            if (self.decode_stride, self.scan_mode) != previous_mode and self.is_playing and self.direction > 0:
+                # Los frames ya decodificados siguen el paso anterior: descartarlos
+                self.seek_to_frame(self.display_index + 1)
+
+    def set_seek_index(self, seek_index):
+        """Asigna el índice de keyframes/PTS del video cargado."""
+        self.seek_index = seek_index
+        self.backward_decoder.seek_index = seek_index
+        self.prefetcher.seek_index = seek_index
+
+    def frame_at_time(self, position):
+        """Índice de frame (0-based) que se presenta en el instante indicado (segundos)."""
+        if self.seek_index:
+            return self.seek_index.frame_at_time(position)
+        return self.timebase.frame_at(position)
+
+    def time_at_frame(self, frame_index):
+        """Instante (segundos) en el que empieza el frame indicado (0-based)."""
+        return self.timebase.time_at(frame_index)
+
     def seek(self, position):
         """Salta a una posición específica (en segundos)."""
-        if self.cap:
-            frame_number = int(position * self.fps)
+        self.seek_to_frame(self.frame_at_time(position))
+        self.current_position = position
+
+    def seek_to_frame(self, frame_number):
+        """Salta a un frame exacto."""
+        with self.cap_lock:
+            if self.cap:
+                frame_number = max(0, int(frame_number))
+                with self.seek_lock:
+                    self.pending_seek = None
+                    self.frame_buffer.flush()
+                self.mailbox.clear()
+                self._position_capture(frame_number)
+                self.next_frame = frame_number
+                self.decoder.end_of_stream = False
+                self.current_frame = frame_number
+                self.display_index = frame_number
+                self._needs_resync = False
+                self._ram_cache = None
+                self._reanchor_clock = True
+                self.master_clock.update(self.timebase.time_at(frame_number + 1), False, jump=True)
+
+    def request_seek(self, frame_number):
+        """
+        Reposiciona el decodificador adelantado sin esperar al seek.
+
+        El buffer se vacía ya y el propio DecodeAheadThread hace el seek antes
+        de su siguiente decodificación; mientras tanto el reproductor puede
+        seguir presentando frames desde memoria.
+        """
+        with self.seek_lock:
+            self.pending_seek = max(0, int(frame_number))
+            self.frame_buffer.flush()
+        self.decoder.end_of_stream = False
+
+    def _apply_pending_seek(self):
+        """
+        Aplica el seek pendiente (se llama con cap_lock adquirido desde el
+        decodificador) y devuelve la generación del buffer a la que pertenecen
+        los frames que se decodifiquen a continuación.
+        """
+        with self.seek_lock:
+            target, self.pending_seek = self.pending_seek, None
+            generation = self.frame_buffer.generation
+        if target is not None:
+            self._position_capture(target)
+            self.next_frame = target
+        return generation
+
+    def _decode_next(self, cap):
+        """
+        Decodifica el siguiente frame a mostrar según el modo de avance
+        (se llama con cap_lock adquirido). Actualiza next_frame.
+        """
+        stride = self.decode_stride
+        if stride > 1 and self.scan_mode and not self.all_intra \
+                and self.seek_index and self.seek_index.has_keyframes():
+            # Modo scan: decodificar sólo keyframes cercanos al objetivo
+            target = self.next_frame + stride - 1
+            keyframe = self.seek_index.keyframe_before(target)
+            if keyframe < self.next_frame:
+                keyframe = self.seek_index.keyframe_after(self.next_frame)
+            if keyframe is None:
+                return False, None
+            if keyframe != self.next_frame:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            ret, frame = cap.read()
+            if ret:
+                self.next_frame = keyframe + 1
+            return ret, frame
+
+        # Saltar con grab() los frames que nunca se mostrarán
+        for _ in range(stride - 1):
+            if not cap.grab():
+                return False, None
+            self.next_frame += 1
+        ret, frame = cap.read()
+        if ret:
+            self.next_frame += 1
+        return ret, frame
+
+    def _position_capture(self, frame_number):
+        """Posiciona el capturador en el keyframe previo y avanza con grab() hasta el frame."""
+        if self.seek_index and self.seek_index.has_keyframes() and not self.all_intra:
+            keyframe = self.seek_index.keyframe_before(frame_number)
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            for _ in range(frame_number - keyframe):
+                if not self.cap.grab():
+                    break
+        else:
             self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            self.current_position = position
-            
+
+    def peek_frame(self, timeout=0.5):
+        """Devuelve el próximo frame a mostrar sin consumirlo del buffer."""
+        item = self.frame_buffer.peek(timeout)
+        return item[1] if item else None
+
+    def _set_display_frame(self, frame_index, frame):
+        self.display_frame = frame
+        self._display_frame_index = frame_index
+
+    def get_display_frame(self):
+        """
+        Frame correspondiente a la posición mostrada (sin consumirlo).
+
+        El frame mostrado se conserva junto a su índice, así que los repintados
+        en pausa no tocan el decodificador; sólo tras un salto hay que obtenerlo.
+        """
+        if self.display_frame is not None and self._display_frame_index == self.display_index:
+            return self.display_frame
+        if self._needs_resync:
+            frame = self.backward_decoder.get_frame(self.display_index)
+        else:
+            frame = self.peek_frame()
+        if frame is not None:
+            self._set_display_frame(self.display_index, frame)
+        return frame
+
+    def step_frame(self, delta):
+        """
+        Avanza o retrocede frames respecto al mostrado sin tocar el decodificador principal.
+
+        Returns:
+            El frame destino o None si está fuera del video.
+        """
+        target = self.display_index + delta
+        if target < 0:
+            return None
+        frame = None
+        if delta > 0 and not self._needs_resync:
+            frame = self._take_from_buffer(target)
+        if frame is None:
+            frame = self.backward_decoder.get_frame(target)
+            if frame is None:
+                return None
+            self._needs_resync = True
+        self.frame_cache.put(target, frame)
+        self.display_index = target
+        self._set_display_frame(target, frame)
+        self.current_frame = target + 1
+        self.current_position = self.timebase.time_at(self.current_frame)
+        self.master_clock.update(self.current_position, False, jump=True)
+        return frame
+
+    def _take_from_buffer(self, frame_index):
+        """Consume el buffer hasta el frame indicado si está alineado con él."""
+        item = self.frame_buffer.peek()
+        while item and item[0] - 1 < frame_index:
+            self.frame_buffer.get()
+            item = self.frame_buffer.peek()
+        if item and item[0] - 1 == frame_index:
+            self.frame_buffer.get()
+            return item[1]
+        return None
+
+    def set_loop(self, start_frame, end_frame):
+        """
+        Activa el bucle A-B entre dos índices de frame (0-based, inclusivos).
+
+        La primera pasada decodifica normalmente y guarda los frames del rango
+        en loop_cache (hasta su presupuesto); las siguientes se sirven desde
+        memoria y sólo se decodifica la parte que no cupo.
+        """
+        self.clear_playlist()
+        start, end = sorted((max(0, int(start_frame)), max(0, int(end_frame))))
+        self.loop_cache.clear()
+        self.loop_range = (start, end)
+        self.seek_to_frame(start)
+
+    def clear_loop(self):
+        """Desactiva el bucle A-B y libera sus frames."""
+        from_ram = self._ram_cache is self.loop_cache
+        self.loop_range = None
+        self.loop_cache.clear()
+        if from_ram:
+            self._leave_ram()
+
+    def set_loop_budget(self, budget_mb):
+        """Presupuesto de memoria para los frames del bucle A-B."""
+        self.loop_cache.set_budget(budget_mb)
+
+    def set_playlist(self, clips):
+        """
+        Reproduce seguidos los rangos [(inicio, fin), ...] (índices 0-based, inclusivos).
+
+        Mientras suena un clip, el prefetcher decodifica los primeros frames del
+        siguiente; al cambiar de clip esos frames se muestran desde memoria
+        mientras el decodificador principal arranca justo detrás de ellos.
+        """
+        self.clear_loop()
+        self.clear_playlist()
+        self.playlist = [tuple(sorted((max(0, int(a)), max(0, int(b))))) for a, b in clips]
+        if self.playlist:
+            self._start_clip(0)
+
+    def clear_playlist(self):
+        """Abandona el modo playlist."""
+        from_ram = self._ram_cache is self.prefetch_cache
+        self.playlist = []
+        self.playlist_pos = -1
+        self.prefetcher.stop()
+        self.prefetch_cache.clear()
+        if from_ram:
+            self._leave_ram()
+
+    def _current_clip(self):
+        if 0 <= self.playlist_pos < len(self.playlist):
+            return self.playlist[self.playlist_pos]
+        return None
+
+    def _start_clip(self, position):
+        """Empieza un clip de la playlist, desde los frames precargados si los hay."""
+        self.prefetcher.stop()
+        self.playlist_pos = position
+        start, end = self.playlist[position]
+        prefetched = self.prefetcher.prefetched_count(start, end - start + 1)
+        if prefetched:
+            # Se presenta ya desde memoria; el decodificador se reposiciona tras
+            # lo precargado en su propio thread, sin bloquear la presentación
+            self.request_seek(start + prefetched)
+            self._enter_ram(self.prefetch_cache, start, start + prefetched - 1)
+        else:
+            self.seek_to_frame(start)
+        # El prefetcher queda libre: preparar ya el inicio del clip siguiente
+        self._prefetch_next_clip()
+        self.clip_changed.emit(position)
+
+    def _prefetch_next_clip(self):
+        position = self.playlist_pos + 1
+        if position < len(self.playlist):
+            start, end = self.playlist[position]
+            count = min(end - start + 1, max(1, int(self.fps * self.PREFETCH_SECONDS)))
+            self.prefetcher.prefetch(start, count)
+
+    def _segment_end(self):
+        """Último frame del bucle o del clip actual (None si se reproduce libremente)."""
+        if self.loop_range:
+            return self.loop_range[1]
+        clip = self._current_clip()
+        return clip[1] if clip else None
+
+    def _on_segment_end(self):
+        """Fin del bucle o del clip actual: volver al inicio o pasar al siguiente clip."""
+        # El último frame del segmento también se muestra durante su duración
+        self.usleep(int(self.clock.frame_duration * 1000000))
+        if self.loop_range:
+            self._wrap_loop()
+        elif self.playlist_pos + 1 < len(self.playlist):
+            self._start_clip(self.playlist_pos + 1)
+        else:
+            self.clear_playlist()
+            self.is_playing = False
+            self.clip_changed.emit(-1)
+
+    def _wrap_loop(self):
+        """Vuelve al inicio del bucle, desde memoria si el primer frame está guardado."""
+        start, end = self.loop_range
+        if start in self.loop_cache:
+            self._enter_ram(self.loop_cache, start, end)
+        else:
+            self.seek_to_frame(start)
+
+    def _enter_ram(self, cache, start, limit):
+        """Reproduce desde memoria los frames start..limit de la caché indicada."""
+        self._ram_cache = cache
+        self._ram_limit = limit
+        self._needs_resync = True
+        self.display_index = start - 1
+        self._reanchor_clock = True
+
+    def _leave_ram(self):
+        """Deja de reproducir desde memoria realineando el decodificador."""
+        self._ram_cache = None
+        if self.is_playing:
+            self.seek_to_frame(self.display_index + 1)
+        else:
+            self._needs_resync = True
+
+    def _resume_decoder(self, frame_index):
+        """Continúa con el decodificador principal a partir del frame indicado."""
+        self._ram_cache = None
+        item = self.frame_buffer.peek(timeout=self.clock.frame_duration)
+        if item and item[0] - 1 == frame_index:
+            # Ya estaba posicionado justo detrás de los frames en memoria
+            self._needs_resync = False
+        else:
+            self.seek_to_frame(frame_index)
+        if self._current_clip():
+            self._prefetch_next_clip()
+
+    def _ram_step(self):
+        """Presenta el siguiente frame desde memoria (bucle o inicio de clip), sin decodificar."""
+        target = self.display_index + 1
+        segment_end = self._segment_end()
+        if segment_end is not None and target > segment_end:
+            self._on_segment_end()
+            return
+        frame = self._ram_cache.get(target) if target <= self._ram_limit else None
+        if frame is None:
+            # Lo que no está en memoria se decodifica desde aquí
+            self._resume_decoder(target)
+            return
+        if self._reanchor_clock:
+            self._reanchor_clock = False
+            self.clock.start(target)
+        if self.clock.should_drop(target):
+            self.display_index = target
+            return
+        image = self._convert(frame, target + 1)
+        wait = self.clock.time_until(target)
+        self.clock.mark_presented(target, wait)
+        if wait > 0:
+            self.usleep(int(wait * 1000000))
+        self._deliver_frame(image, frame, target + 1)
+
+    def set_cache_budget(self, budget_mb):
+        """Presupuesto de memoria de la caché de frames."""
+        self.frame_cache.set_budget(budget_mb)
+
+    def set_buffer_size(self, size):
+        """Ajusta la profundidad del buffer de decodificación adelantada."""
+        self.frame_buffer.set_capacity(size)
+
+    def set_mailbox_mode(self, enabled):
+        """Activa el buzón de último frame (True) o la entrega por señal de cada frame (False)."""
+        self.use_mailbox = enabled
+        self.mailbox.clear()
+
+    def get_buffer_stats(self):
+        """Profundidad actual del buffer y contadores de aciertos/fallos."""
+        stats = self.frame_buffer.get_stats()
+        stats['mailbox_dropped'] = self.mailbox.dropped
+        return stats
+
     def run(self):
         """Loop principal del thread."""
+        last_stats_time = time.monotonic()
         while self.cap:
-            if self.is_playing:
-                ret, frame = self.cap.read()
-                if ret:
-                    self.frame_ready.emit(frame)
-                    
-                    # Actualizar posición
-                    frame_pos = self.cap.get(cv2.CAP_PROP_POS_FRAMES)
-                    time_pos = frame_pos / self.fps
-                    self.position_changed.emit(time_pos,int(frame_pos))
-                    self.msleep(self.frame_delay)
-                else:
+            if self.is_playing and self.direction < 0:
+                self._reverse_step()
+            elif self.is_playing and self._ram_cache is not None:
+                self._ram_step()
+            elif self.is_playing:
+                item = self.frame_buffer.get(timeout=self.clock.frame_duration)
+                if item:
+                    frame_pos, frame = item
+                    if self._reanchor_clock:
+                        self._reanchor_clock = False
+                        self.clock.start(frame_pos)
+
+                    # Descartar frames que ya pasaron su ventana en vez de ralentizar
+                    if not self.clock.should_drop(frame_pos):
+                        # Escalado y conversión de color fuera del thread de la GUI
+                        image = self._convert(frame, frame_pos)
+                        wait = self.clock.time_until(frame_pos)
+                        self.clock.mark_presented(frame_pos, wait)
+                        if wait > 0:
+                            self.usleep(int(wait * 1000000))
+                        self._deliver_frame(image, frame, frame_pos)
+                    segment_end = self._segment_end()
+                    if segment_end is not None and frame_pos - 1 >= segment_end:
+                        self._on_segment_end()
+
+                    now = time.monotonic()
+                    if now - last_stats_time >= 1.0:
+                        last_stats_time = now
+                        self.emit_timing_stats()
+                elif self.decoder.end_of_stream and self.frame_buffer.depth == 0:
+                    if self._segment_end() is not None:
+                        self._on_segment_end()
+                        continue
                     self.is_playing = False
+                    self.emit_timing_stats()
             else:
                 self.msleep(100)
-                
+
+    def _reverse_step(self):
+        """Presenta el frame anterior al mostrado (reproducción hacia atrás)."""
+        target = self.display_index - 1
+        if target < 0:
+            self.is_playing = False
+            return
+        # El reloj trabaja con índices crecientes: se usa el índice negado
+        tick = -target
+        if self._reanchor_clock:
+            self._reanchor_clock = False
+            self.clock.start(tick)
+        self._needs_resync = True
+        if self.clock.should_drop(tick):
+            self.display_index = target
+            return
+        frame = self.backward_decoder.get_frame(target)
+        if frame is None:
+            self.is_playing = False
+            return
+        image = self._convert(frame, target + 1)
+        wait = self.clock.time_until(tick)
+        self.clock.mark_presented(tick, wait)
+        if wait > 0:
+            self.usleep(int(wait * 1000000))
+        self._deliver_frame(image, frame, target + 1)
+
+    def set_roi_track(self, roi_track):
+        """ROI animada (RoiTrack) que se aplica a cada frame según su instante, o None."""
+        self.roi_track = roi_track
+
+    def _convert(self, frame, frame_pos):
+        """Escala y convierte un frame registrando los tiempos de cada etapa."""
+        if self.roi_track is not None:
+            self.converter.set_roi(self.roi_track.roi_at(self.timebase.time_at(frame_pos)))
+        image = self.converter.convert(frame)
+        self.metrics.record_timings(self.converter.timings)
+        return image
+
+    def get_cache_memory_mb(self):
+        """Memoria ocupada por las cachés de frames (MB)."""
+        caches = (self.frame_cache, self.loop_cache, self.prefetch_cache)
+        return sum(cache.used_bytes for cache in caches) / (1024 * 1024)
+
+    def get_dropped_frames(self):
+        """Frames descartados por el reloj o sobrescritos en el buzón."""
+        return self.clock.dropped_frames + self.mailbox.dropped
+
+    def _deliver_frame(self, image, frame, frame_pos):
+        """Entrega un frame a la GUI por el buzón o por señal."""
+        self.display_index = frame_pos - 1
+        self._set_display_frame(self.display_index, frame)
+        self.frame_cache.put(self.display_index, frame)
+        if self.loop_range and self.loop_range[0] <= self.display_index <= self.loop_range[1] \
+                and self.display_index not in self.loop_cache and self.loop_cache.has_room(frame.nbytes):
+            # Se conserva el principio del rango: un LRU expulsaría justo lo próximo a reproducir
+            self.loop_cache.put(self.display_index, frame)
+        time_pos = self.timebase.time_at(frame_pos)
+        self.current_frame = frame_pos
+        self.current_position = time_pos
+        self.master_clock.update(time_pos, self.is_playing, self.speed * self.direction)
+        if self.use_mailbox:
+            # Sólo se avisa si el buzón estaba vacío: nunca se acumulan eventos
+            if self.mailbox.post((image, frame, time_pos, int(frame_pos))):
+                self.mailbox_ready.emit()
+        else:
+            self.frame_ready.emit(frame)
+            self.image_ready.emit(image, frame)
+            self.position_changed.emit(time_pos,int(frame_pos))
+
+    def emit_timing_stats(self):
+        """Emite el desvío acumulado y los frames descartados (por reloj o sobrescritos en el buzón)."""
+        dropped = self.get_dropped_frames()
+        self.timing_stats.emit(self.clock.accumulated_drift * 1000, dropped)
+
     def resetThread(self):
         """Reinicia el thread de video."""
-        self.cap = None
+        with self.cap_lock:
+            if self.cap:
+                self.cap.release()
+            self.cap = None
+            self.pending_seek = None
+            self.frame_buffer.flush()
+        self.mailbox.clear()
+        self.backward_decoder.close()
+        self.frame_cache.clear()
+        self.loop_cache.clear()
+        self.loop_range = None
+        self.prefetcher.close()
+        self.prefetch_cache.clear()
+        self.playlist = []
+        self.playlist_pos = -1
+        self._ram_cache = None
+        self.seek_index = None
+        self.roi_track = None
+        self._set_display_frame(-1, None)
+        self.next_frame = 0
+        self.display_index = 0
+        self._needs_resync = False
+        self.direction = 1
         self.is_playing = False
         self.current_position = 0
         self.current_frame = 0
         self.fps = 30
-        self.frame_delay = 33  # milliseconds
+        self.timebase = Timebase(self.fps)
+        self.frame_delay = int(1000 / self.fps / self.speed)
+        self.clock.fps = self.fps
+        self.clock.reset_stats()
@@ -3,19 +3,24 @@ import json
 from pathlib import Path
 from items.video_item import VideoItem
 from core.project_manager import ProjectManager
+from core.proxy_manager import ProxyManager, ProxyJob
 from video_player_module.video_controller_bar import VideoControlBar
 from video_player_module.video_player import VideoPlayerWidget
+from video_player_module.seek_index import SeekIndex
+from video_player_module.roi import FULL_FRAME, RoiTrack
 from timeline_module.timeline import Timeline
+from timeline_module.thumbnail_cache import get_thumbnail_service
 from actions_module.actionsWidget import ActionsWidget
 from events_module.tactical_event_widget import TacticalEventWidget
 from events_module.tactical_event import TacticalEvent
 from components.eventWidget import EventWidget
 from components.event_type_module import TemplateManagerDialog
 from utils import time_to_position, position_to_time, format_time, format_time_long
+from utils.ui_coalescer import UpdateCoalescer
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QSplitter, QMenuBar, QMenu, QAction, QToolBar, QPushButton, QLabel, QSlider,
-    QStatusBar, QDockWidget, QMessageBox, QFileDialog
+    QStatusBar, QDockWidget, QMessageBox, QFileDialog, QInputDialog
 )
 from PyQt5.QtCore import Qt, QSettings, pyqtSignal, QTimer
 from PyQt5.QtGui import QKeySequence, QIcon
@@ -33,10 +38,15 @@ class MainWindow(QMainWindow):
         
         # Gestores principales
         self.project_manager = ProjectManager()
+        self.proxy_manager = ProxyManager()
+        self.proxy_job = None
         #self.event_manager = EventManager()
         
         # Estado de la aplicación
         self.current_video_path = None
+        self.current_proxy_path = None
+        self.timeline_selection = None  # Último rango (segundos) seleccionado en el timeline
+        self.playlist_events = []  # Eventos de la playlist en reproducción
         self.is_playing = False
         self.current_position = 0.0
         self.current_second = 0
@@ -49,13 +59,18 @@ class MainWindow(QMainWindow):
         
         # Cargar configuración guardada
         self.settings = QSettings()
+        # Actualizaciones de playhead y barra de controles agrupadas al mismo ritmo (0 = refresco de pantalla)
+        ui_interval = self.settings.value("ui/update_interval_ms", 0, type=int) or None
+        self.playhead_coalescer = UpdateCoalescer(self._apply_timeline_playhead, ui_interval, self)
         # Crear interfaz
         self._create_widgets()
+        self.video_player.set_ui_update_interval(ui_interval)
         self._create_menus()
         #self._create_toolbars()
         self._create_statusbar()
         self._setup_layout()
         self._connect_signals()
+        self.video_player.set_loop_budget(self.settings.value("playback/loop_budget_mb", 512, type=int))
         #self.on_zoom_changed(self.zoom_slider.value())
         self.cicons = IconDatabase().get_icons()
         print("Icons loaded:", list(self.cicons.keys()))
@@ -151,6 +166,33 @@ class MainWindow(QMainWindow):
         import_action.triggered.connect(self._open_video)
         video_menu.addAction(import_action)
         
+        # Proxy de reproducción
+        proxy_action = QAction("Generar &Proxy de Reproducción", self)
+        proxy_action.triggered.connect(self.generate_proxy)
+        video_menu.addAction(proxy_action)
+        
+        # Bucle A-B
+        loop_action = QAction("Reproducir &Selección en Bucle", self)
+        loop_action.setShortcut("Ctrl+L")
+        loop_action.triggered.connect(self.loop_timeline_selection)
+        video_menu.addAction(loop_action)
+        
+        clear_loop_action = QAction("&Quitar Bucle", self)
+        clear_loop_action.setShortcut("Ctrl+Shift+L")
+        clear_loop_action.triggered.connect(self.video_player.clear_loop)
+        video_menu.addAction(clear_loop_action)
+        
+        video_menu.addSeparator()
+        
+        # Multi-ángulo
+        add_angle_action = QAction("Añadir Á&ngulo Sincronizado...", self)
+        add_angle_action.triggered.connect(self.add_video_angle)
+        video_menu.addAction(add_angle_action)
+        
+        remove_angles_action = QAction("Quitar Ángulos", self)
+        remove_angles_action.triggered.connect(self.video_player.remove_angles)
+        video_menu.addAction(remove_angles_action)
+        
         # Exportar
         export_menu = file_menu.addMenu("&Exportar")
         
@@ -166,6 +208,10 @@ class MainWindow(QMainWindow):
         #export_pdf.triggered.connect(lambda: self.export_data('pdf'))
         export_menu.addAction(export_pdf)
         
+        export_bundle = QAction("Exportar Proyecto con Video...", self)
+        export_bundle.triggered.connect(self._export_project_bundle)
+        export_menu.addAction(export_bundle)
+        
         export_clips = QAction("Generar Clips de Video", self)
         #export_clips.triggered.connect(self.export_clips)
         #export_menu.addAction(export_clips)
@@ -193,9 +239,22 @@ class MainWindow(QMainWindow):
         # Toggle panel de eventos
         view_menu.addAction(self.event_dock.toggleViewAction())
         
+        # HUD de rendimiento
+        hud_action = QAction("HUD de &Rendimiento", self)
+        hud_action.setCheckable(True)
+        hud_action.setShortcut("F12")
+        hud_action.toggled.connect(self.video_player.set_hud_visible)
+        view_menu.addAction(hud_action)
+        
         # Menú Herramientas
         tools_menu = menubar.addMenu("&Herramientas")
         
+        # Registro de métricas
+        self.metrics_log_action = QAction("Registrar &Métricas en CSV...", self)
+        self.metrics_log_action.setCheckable(True)
+        self.metrics_log_action.toggled.connect(self.toggle_metrics_log)
+        tools_menu.addAction(self.metrics_log_action)
+        
         # Configuración
         settings_action = QAction("&Configuración", self)
         settings_action.triggered.connect(self.show_settings)
@@ -288,7 +347,11 @@ class MainWindow(QMainWindow):
         self.timeline.video_selected.connect(self.play_from_timeline)
         self.timeline.timeline_changed.connect(self.on_timeline_changed)
         self.timeline.playhead_moved.connect(self.on_playhead_moved)
+        self.timeline.selection_changed.connect(self.on_timeline_selection_changed)
+        self.timeline.event_clicked.connect(self.jump_to_event)
+        self.timeline.set_event_categories(self.event_panel.EVENT_TYPES)
         self.video_player.position_changed.connect(self.update_timeline_playhead)
+        self.video_player.load_failed.connect(self.on_video_load_failed)
         
         self.zoom_slider.valueChanged.connect(self.on_zoom_changed)
         self.zoom_in_button.clicked.connect(self.zoom_in)
@@ -300,6 +363,12 @@ class MainWindow(QMainWindow):
         self.event_panel.event_selected.connect(self.jump_to_event)
         self.event_panel.event_added.connect(self.on_event_added)
         self.event_panel.event_deleted.connect(self.on_event_deleted)
+        self.event_panel.events_changed.connect(self.timeline.set_events)
+        self.event_panel.event_loop_requested.connect(self.loop_event)
+        self.event_panel.playlist_requested.connect(self.play_event_playlist)
+        self.event_panel.roi_keyframe_requested.connect(self.add_event_roi_keyframe)
+        self.event_panel.roi_cleared.connect(self.clear_event_roi)
+        self.video_player.playlist_clip_changed.connect(self.on_playlist_clip_changed)
         
         # actionsWidget signals
         self.actiosns_panel.event_added.connect(self.on_sction_event_added)
@@ -321,15 +390,117 @@ class MainWindow(QMainWindow):
         
         if file_path:
             self.current_video_path = file_path
-            self.video_player.load_video(file_path)
-            item = VideoItem(file_path)
-            self.timeline.add_video(file_path, item.duration)
-            self.timeline.set_playhead_position(0)
+            self._start_video_load(file_path)
             self.isSettingsAvailable = False
             
+    def toggle_metrics_log(self, checked):
+        """Inicia o detiene el registro de métricas de reproducción en CSV."""
+        if not checked:
+            self.video_player.stop_metrics_log()
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Registrar Métricas", "metricas_reproduccion.csv", "CSV (*.csv)")
+        if not file_path:
+            self.metrics_log_action.setChecked(False)
+            return
+        try:
+            self.video_player.start_metrics_log(file_path)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"No se pudo crear el archivo: {e}")
+            self.metrics_log_action.setChecked(False)
+            
+    def add_video_angle(self):
+        """Añade un ángulo secundario sincronizado con el video principal."""
+        if not self.isVideoLoaded():
+            QMessageBox.warning(self, "Advertencia", "Primero debe cargar un video")
+            return
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Añadir Ángulo",
+            "",
+            "Videos (*.mp4 *.avi *.mov *.mkv *.flv);;Todos los archivos (*.*)"
+        )
+        if not file_path:
+            return
+        offset, ok = QInputDialog.getDouble(
+            self, "Desfase del Ángulo",
+            "Segundos de este ángulo respecto al principal:", 0.0, -36000.0, 36000.0, 2)
+        if not ok:
+            return
+        # Los ángulos secundarios se decodifican desde el proxy si ya existe
+        proxy_path = self.proxy_manager.find_proxy(file_path)
+        self.video_player.add_angle(file_path, offset, reduced=True, playback_path=proxy_path)
+        
+    def _start_video_load(self, video_path, seek_index=None, recorded_proxy=None):
+        """Carga el video en segundo plano; el timeline se crea al terminar el sondeo."""
+        self._cancel_proxy_job()
+        self.current_proxy_path = self.proxy_manager.find_proxy(video_path, recorded_proxy)
+        pipeline = self.video_player.load_video_async(video_path, seek_index, self.current_proxy_path)
+        pipeline.probed.connect(self.on_video_probed)
+        pipeline.thumbnail_ready.connect(self.timeline.set_video_thumbnail)
+        pipeline.progress.connect(self.on_video_load_progress)
+        pipeline.load_failed.connect(self.on_video_load_failed)
+        pipeline.start()
+        
+    def on_video_probed(self, info):
+        if self.sender() is not self.video_player.load_pipeline:
+            return
+        get_thumbnail_service().set_decode_path(self.current_video_path, self.current_proxy_path)
+        self.timeline.add_video(self.current_video_path, info.duration_ms)
+        self.timeline.set_playhead_position(0)
+        auto_proxy = self.settings.value("proxy/auto", True, type=bool)
+        if auto_proxy and not self.current_proxy_path and self.proxy_manager.needs_proxy(info):
+            self.generate_proxy()
+            
+    def generate_proxy(self):
+        """Transcodifica en segundo plano un proxy de baja resolución del video actual."""
+        if not self.current_video_path:
+            QMessageBox.warning(self, "Advertencia", "Primero debe cargar un video")
+            return
+        if self.current_proxy_path or (self.proxy_job and self.proxy_job.isRunning()):
+            return
+        self.proxy_job = ProxyJob(
+            self.current_video_path,
+            self.proxy_manager.proxy_path_for(self.current_video_path),
+            self.proxy_manager.height
+        )
+        self.proxy_job.progress.connect(
+            lambda percent: self.statusbar.showMessage(f"Generando proxy... {percent}%", 2000))
+        self.proxy_job.proxy_ready.connect(self.on_proxy_ready)
+        self.proxy_job.proxy_failed.connect(self.on_video_load_failed)
+        self.proxy_job.start()
+        
+    def on_proxy_ready(self, source_path, proxy_path):
+        if source_path != self.current_video_path:
+            return
+        self.proxy_manager.register(source_path, proxy_path)
+        self.current_proxy_path = proxy_path
+        get_thumbnail_service().set_decode_path(source_path, proxy_path)
+        self.video_player.set_playback_source(proxy_path)
+        self.statusbar.showMessage("Proxy listo: la reproducción usa el proxy", 3000)
+        
+    def _cancel_proxy_job(self):
+        if self.proxy_job and self.proxy_job.isRunning():
+            self.proxy_job.cancel()
+            self.proxy_job.wait()
+        self.proxy_job = None
+        
+    def on_video_load_progress(self, stage, percent):
+        stage_names = {
+            'probe': "Analizando video",
+            'first_frame': "Abriendo video",
+            'thumbnails': "Generando miniaturas",
+            'seek_index': "Indexando keyframes",
+        }
+        self.statusbar.showMessage(f"{stage_names.get(stage, stage)}... {percent}%", 2000)
+        
+    def on_video_load_failed(self, message):
+        QMessageBox.warning(self, "Advertencia", message)
+            
     def set_duration(self, duration, total_frames,fps):
         """Establece la duración total del video."""
         self.controls_bar.set_video_info(total_frames,fps)
+        self.timeline.set_timebase(self.video_player.timebase)
         
     
     # acciones de timeline
@@ -349,16 +520,22 @@ class MainWindow(QMainWindow):
         if not self.current_video_path:
             QMessageBox.warning(self, "Advertencia", "No puede cambiar la configuración con un video cargado")
             return
-        seconds = (x / self.timeline.pixels_per_second) 
+        frame_index = self.timeline.frame_at_x(x)
+        seconds = self.timeline.timebase.time_at(frame_index)
         if not self.video_player.is_playing:
-            self.video_player.set_position(seconds)
-            self.timeline.set_playhead_position(x)
+            self.video_player.set_frame_position(frame_index)
+            self.timeline.set_playhead_position(self.timeline.x_at_frame(frame_index))
             self.controls_bar.update_time_labels2(seconds)
         
                 
     def update_timeline_playhead(self, seconds, frame):
+        # La posición se guarda siempre (la usan los eventos); el timeline se
+        # actualiza agrupado, como mucho una vez por refresco de pantalla
         self.current_second =seconds
         self.current_frame =frame
+        self.playhead_coalescer.post(seconds, frame)
+        
+    def _apply_timeline_playhead(self, seconds, frame):
         x_position = seconds * self.timeline.pixels_per_second
         self.timeline.set_playhead_position(x_position)
         self.timeline.actualize_data(seconds, frame)
@@ -388,33 +565,107 @@ class MainWindow(QMainWindow):
             self.statusbar.showMessage("Modo corte desactivado", 2000)
     # acciones de event panel
      
+    def event_frame_range(self, event):
+        """Rango [inicio, fin) en frames de un evento serializado."""
+        return TacticalEvent.from_dict(event).frame_range(self.video_player.timebase)
+        
     def jump_to_event(self, event):
         """Salta a la posición del evento seleccionado."""
         if event:
-            start_time = event['event_start']
-            end_time = event['event_end']
-            self.video_player.set_position(start_time)
+            start_frame, end_frame = self.event_frame_range(event)
+            start_time = self.video_player.timebase.time_at(start_frame)
+            end_time = self.video_player.timebase.time_at(end_frame)
+            self.video_player.set_roi_track(event.get('roi_keyframes'))
+            self.video_player.set_frame_position(start_frame)
             self.statusbar.showMessage(f"Saltando a evento: {event['event_type']} en {event['event_start']:.2f}s", 3000)
             #self.update_timeline_playhead(start_time)
             x_position = start_time * self.timeline.pixels_per_second
             self.timeline.set_playhead_position(x_position)
             self.timeline.add_event_selection(start_time,end_time)
         
+    def loop_event(self, event):
+        """Reproduce en bucle el rango del evento."""
+        if event and self.isVideoLoaded():
+            self.jump_to_event(event)
+            self.video_player.set_loop_frames(*self.event_frame_range(event))
+            self.statusbar.showMessage(f"Bucle: {event['event_start']:.2f}s - {event['event_end']:.2f}s", 3000)
+            
+    def add_event_roi_keyframe(self, event_id):
+        """Guarda el zoom actual como keyframe del evento en la posición actual."""
+        event = self.event_panel.event_manager.find_event(event_id)
+        if event is None or not self.isVideoLoaded():
+            return
+        position = self.video_player.get_position()
+        if not event.event_start <= position <= event.event_end:
+            QMessageBox.warning(self, "Advertencia", "La posición actual está fuera del evento")
+            return
+        track = RoiTrack(event.roi_keyframes)
+        track.set_keyframe(position, self.video_player.current_roi() or FULL_FRAME)
+        self.event_panel.event_manager.update_event(event_id, roi_keyframes=track.to_list())
+        self.video_player.set_roi_track(track.to_list())
+        self.statusbar.showMessage(f"Zoom guardado en {position:.2f}s ({len(track)} keyframes)", 3000)
+        
+    def clear_event_roi(self, event_id):
+        """Elimina la animación de zoom de un evento."""
+        if self.event_panel.event_manager.update_event(event_id, roi_keyframes=[]):
+            self.video_player.set_roi_track(None)
+            
+    def play_event_playlist(self, events):
+        """Reproduce seguidos los rangos de los eventos indicados."""
+        if not self.isVideoLoaded():
+            QMessageBox.warning(self, "Advertencia", "Primero debe cargar un video")
+            return
+        # Los eventos sin duración se descartan aquí para que los índices de
+        # playlist_clip_changed sigan correspondiendo a playlist_events
+        clips = [(event, self.event_frame_range(event)) for event in events]
+        clips = [(event, frames) for event, frames in clips if frames[1] > frames[0]]
+        if not clips:
+            self.statusbar.showMessage("Los eventos seleccionados no tienen duración", 3000)
+            return
+        self.playlist_events = [event for event, _ in clips]
+        self.video_player.play_playlist_frames([frames for _, frames in clips])
+        
+    def on_playlist_clip_changed(self, index):
+        """Muestra el clip de la playlist en reproducción."""
+        if 0 <= index < len(self.playlist_events):
+            event = self.playlist_events[index]
+            self.video_player.set_roi_track(event.get('roi_keyframes'))
+            self.statusbar.showMessage(
+                f"Playlist {index + 1}/{len(self.playlist_events)}: {event['event_name']} "
+                f"({event['event_start']:.2f}s - {event['event_end']:.2f}s)", 0)
+        else:
+            self.playlist_events = []
+            self.statusbar.showMessage("Playlist terminada", 2000)
+            
+    def on_timeline_selection_changed(self, start_time, end_time):
+        """Recuerda la última selección del timeline para el bucle A-B."""
+        self.timeline_selection = (start_time, end_time)
+        
+    def loop_timeline_selection(self):
+        """Reproduce en bucle la selección actual del timeline."""
+        if self.timeline_selection and self.isVideoLoaded():
+            start_time, end_time = self.timeline_selection
+            self.video_player.set_loop_range(start_time, end_time)
+            self.statusbar.showMessage(f"Bucle: {start_time:.2f}s - {end_time:.2f}s", 3000)
+        
     def on_event_added(self, event):
         #print(f"Nuevo evento en {event.timestamp:.2f}s")
         self.timeline.add_event_clip(event)    
           
-    def on_event_deleted(self, event):
-        print(f"Nuevo evento en {event.timestamp:.2f}s")
-        self.timeline.event_deleted(event)     
+    def on_event_deleted(self, event_id):
+        self.timeline.event_deleted(event_id)
         
     # acciones actionsWidget
     def on_sction_event_added(self, event):
         if not self.current_video_path:
             QMessageBox.warning(self, "Advertencia", "Primero debe cargar un video")
             return
-        position_end = self.current_second
-        position_start = position_end - float(event['time'])
+        # El evento termina en el frame actual y se guarda en frames (exactos con fps NTSC)
+        timebase = self.video_player.timebase
+        end_frame = self.current_frame or 0
+        start_frame = max(0, end_frame - timebase.frame_count(float(event['time'])))
+        position_start = timebase.time_at(start_frame)
+        position_end = timebase.time_at(end_frame)
         print(f"Nueva accion evento en {event}")
         new_event = {
             'event_start': position_start,
@@ -429,6 +680,8 @@ class MainWindow(QMainWindow):
             event_type=event['categoria'],
             event_start=position_start,
             event_end=position_end,
+            start_frame=start_frame,
+            end_frame=end_frame,
             event_duration=event['time'])
         #self.event_panel.add_event(new_event)
         self.event_panel.add_event(tactical_event)
@@ -447,19 +700,57 @@ class MainWindow(QMainWindow):
             "", 
             "Todos los archivos (*.vta)"
         )
-        video_path = self.current_video_path
+        video_path = self.source_video_path()
         events = self.event_panel.get_all_events()
         print(f"Guardando proyecto con video: {video_path} y {len(events)} eventos")
         for event in events:
             print(f"Evento: {event}")
         project_data = self.project_manager.create_project_data(video_path, events,[],0,12000,30,15,1)
+        # Persistir el índice de búsqueda junto al proyecto
+        seek_index = self.video_player.seek_index
+        if fileName and seek_index:
+            index_path = SeekIndex.index_path_for_project(fileName)
+            if seek_index.save(index_path):
+                project_data['video']['seek_index'] = os.path.basename(index_path)
+        # Mapeo al proxy de reproducción para reutilizarlo al reabrir
+        if video_path and self.current_proxy_path:
+            project_data['video']['proxy'] = self.proxy_manager.to_project_data(video_path, self.current_proxy_path)
         self.project_manager.save_project(fileName,project_data)
         
     
+    def source_video_path(self):
+        """Video original para exportar o analizar (nunca el proxy de reproducción)."""
+        path = self.video_player.playback_path or self.current_video_path
+        return self.proxy_manager.resolve_source(path) if path else None
+        
+    def _export_project_bundle(self):
+        """Exporta el proyecto junto con el video original en un ZIP."""
+        video_path = self.source_video_path()
+        if not video_path:
+            QMessageBox.warning(self, "Advertencia", "Primero debe cargar un video")
+            return
+        fileName, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar proyecto con video",
+            "",
+            "Archivos ZIP (*.zip)"
+        )
+        if not fileName:
+            return
+        events = self.event_panel.get_all_events()
+        project_data = self.project_manager.create_project_data(video_path, events,[],0,12000,30,15,1)
+        ok, message = self.project_manager.export_project_bundle(project_data, fileName)
+        if ok:
+            self.statusbar.showMessage(message, 3000)
+        else:
+            QMessageBox.warning(self, "Advertencia", message)
+        
     def _new_project(self):    
         
         self.project_manager.new_project()
+        self._cancel_proxy_job()
         self.current_video_path = None
+        self.current_proxy_path = None
         self.video_player.clear_video()
         self.timeline.clear_timeline()
         self.event_panel.clear_all_events() 
@@ -481,16 +772,17 @@ class MainWindow(QMainWindow):
                 video =project_data[2].get('video', None)
                 video_path = video.get('path', None)
                 events = project_data[2].get('moments', [])
-                self.import_project_data(video_path,events)
+                index_path = SeekIndex.index_path_for_project(file_path)
+                seek_index = SeekIndex.load(index_path, video_path)
+                recorded_proxy = video.get('proxy')
+                self.import_project_data(video_path,events,seek_index,recorded_proxy)
                 self.isSettingsAvailable = False
           
           
-    def import_project_data(self, video_path, events):      
+    def import_project_data(self, video_path, events, seek_index=None, recorded_proxy=None):      
         if video_path:
             self.current_video_path = video_path
-            self.video_player.load_video(video_path)
-            item = VideoItem(video_path)
-            self.timeline.add_video(video_path, item.duration)
+            self._start_video_load(video_path, seek_index, recorded_proxy)
             for event in events:
                 
                 tactical_event = TacticalEvent(
@@ -499,7 +791,10 @@ class MainWindow(QMainWindow):
                     event_type=event['event_type'],
                     event_start=event['event_start'],
                     event_end=event['event_end'],
-                    event_duration=event['event_duration']
+                    start_frame=event.get('start_frame'),
+                    end_frame=event.get('end_frame'),
+                    event_duration=event['event_duration'],
+                    roi_keyframes=event.get('roi_keyframes', [])
                 )
                 self.event_panel.add_event(tactical_event, loaded=True)
                 self.on_event_added(event)